@@ -1,4 +1,4 @@
-from typing import Generator, Set, Tuple, List, Dict, Any
+from typing import Generator, Iterable, Tuple, List, Dict, Any
 import numpy as np
 import logging
 import librosa
@@ -9,8 +9,16 @@ logger = logging.getLogger(__name__)
 
 from ..io.base import AudioReader
 
-# active_pitches_array returns active PCs, PC data, detailed peak data, total voiced frames
-from ..core.pitch import active_pitches_array
+# active_pitches_array returns active PCs, PC data, detailed peak data, total voiced frames;
+# pitch_frames / aggregate_pitch_frames are its per-frame and per-window halves
+from ..core.pitch import (
+    HOP_LENGTH,
+    PCStats,
+    active_pitches_array,
+    aggregate_pitch_frames,
+    pitch_frames,
+    pitch_frames_batch,
+)
 
 # identify_chord now accepts active_pitch_classes AND detailed_peak_detections
 from ..core.chord import identify_chord
@@ -28,6 +36,7 @@ class ChordAnalyzer:
         min_frame_ratio: float = 0.3,
         min_prominence_db: float = 8,
         max_level_diff_db: float = 15,
+        backend: str = "cpu",  # "cpu" or "cuda" (CQT on the GPU, needs cupy)
     ):
         self.reader = reader
         self.win_sec = win_sec
@@ -36,16 +45,45 @@ class ChordAnalyzer:
         self.min_frame_ratio = min_frame_ratio
         self.min_prominence_db = min_prominence_db
         self.max_level_diff_db = max_level_diff_db
+        if backend == "cuda":
+            # Imported here so that CPU users never pay for the cupy probe
+            from ..core import pitch_gpu
+
+            if not pitch_gpu.HAS_GPU:
+                logger.warning(
+                    "CUDA backend requested but cupy/GPU not available; using CPU."
+                )
+                backend = "cpu"
+        self.backend = backend
 
     def _analyze_segment(self, seg: np.ndarray, sr: int) -> Tuple[
         str | None,
-        Set[int],
-        List[Dict],
+        int,
+        PCStats,
         List[Dict[str, Any]],
         float,
         int,
     ]:
         """Core analysis shared by mic & file."""
+        voiced_frames, frame_peaks = pitch_frames(seg, sr, **self._frame_params())
+        return self._analyze_frames(seg, voiced_frames, frame_peaks)
+
+    def _frame_params(self) -> Dict[str, Any]:
+        """Keyword arguments for `pitch_frames`."""
+        return dict(
+            frame_energy_thresh_db=self.frame_energy_thresh_db,
+            min_prominence_db=self.min_prominence_db,
+            max_level_diff_db=self.max_level_diff_db,
+            backend=self.backend,
+        )
+
+    def _analyze_frames(
+        self,
+        seg: np.ndarray,
+        voiced_frames: np.ndarray,
+        frame_peaks: List[Any],
+    ) -> Tuple[str | None, int, PCStats, List[Dict[str, Any]], float, int]:
+        """Window half of `_analyze_segment`, given the per-frame results for `seg`."""
         segment_rms = np.sqrt(np.mean(seg**2))
         segment_rms_db = (
             librosa.amplitude_to_db(segment_rms, ref=1e-10)
@@ -53,13 +91,8 @@ class ChordAnalyzer:
             else -120.0
         )
 
-        active_pcs, pc_data, detailed_peaks, voiced = active_pitches_array(
-            seg,
-            sr,
-            frame_energy_thresh_db=self.frame_energy_thresh_db,
-            min_frame_ratio=self.min_frame_ratio,
-            min_prominence_db=self.min_prominence_db,
-            max_level_diff_db=self.max_level_diff_db,
+        active_pcs, pc_data, detailed_peaks, voiced = aggregate_pitch_frames(
+            voiced_frames, frame_peaks, min_frame_ratio=self.min_frame_ratio
         )
 
         chord = identify_chord(active_pcs, detailed_peaks)
@@ -73,6 +106,37 @@ class ChordAnalyzer:
             voiced,
         )
 
+    def _sliding_windows(
+        self, y: np.ndarray, sr: int
+    ) -> Generator[Tuple[int, np.ndarray, np.ndarray, List[Any]], None, None]:
+        """
+        Yield ``(start, seg, voiced_frames, frame_peaks)`` for every `win_sec` window
+        of `y`, `hop_sec` apart. Overlapping windows share their CQT frames, so the
+        per-frame stage runs once over the whole signal and each window takes the
+        slice of frames centred inside it.
+        """
+        hop = int(self.hop_sec * sr)
+        win = int(self.win_sec * sr)
+        voiced_frames, frame_peaks = pitch_frames(
+            y, sr, memoize_cqt=True, **self._frame_params()
+        )
+        frames_per_win = 1 + win // HOP_LENGTH
+        for start in range(0, len(y) - win + 1, hop):
+            first = round(start / HOP_LENGTH)
+            frames = slice(first, first + frames_per_win)
+            seg = y[start : start + win]
+            yield start, seg, voiced_frames[frames], frame_peaks[frames]
+
+    def warmup(self, sr: int) -> None:
+        """
+        Run one throwaway analysis on a synthetic `win_sec` tone at `sr`, so that
+        one-time costs (lazy imports, numba compilation) are not paid by the
+        first real window.
+        """
+        t = np.arange(int(self.win_sec * sr)) / sr
+        tone = (0.1 * np.sin(2 * np.pi * 261.63 * t)).astype(np.float32)  # C4
+        self._analyze_segment(tone, sr)
+
     # -------- single file --------
     # This method is currently only used by the file_analyze CLI, which doesn't display detailed notes.
     # It will continue to use the simpler identify_chord logic that only takes pitch classes.
@@ -90,6 +154,8 @@ class ChordAnalyzer:
                 min_frame_ratio=self.min_frame_ratio,
                 min_prominence_db=self.min_prominence_db,
                 max_level_diff_db=self.max_level_diff_db,
+                backend=self.backend,
+                memoize_cqt=True,
             )
         )
 
@@ -98,6 +164,50 @@ class ChordAnalyzer:
             active_pitch_classes, detailed_peak_detections
         )  # Pass detailed peaks
 
+    # -------- many files --------
+    # Files of the same length (e.g. fixed-length clips) are stacked so that one
+    # CQT call covers a whole batch, and the batches are fanned out over worker
+    # processes (processes rather than threads: the per-frame peak picking holds
+    # the GIL). Gives the same chords as calling analyze_file on each path.
+    def analyze_files(
+        self, paths: Iterable[str], batch_size: int = 8
+    ) -> list[str | None]:
+        signals = Parallel(n_jobs=-1, prefer="threads")(
+            delayed(self.reader)(str(path)) for path in paths
+        )
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for i, (y, sr) in enumerate(signals):
+            groups.setdefault((sr, len(y)), []).append(i)
+        batches = [
+            idx[start : start + batch_size]
+            for idx in groups.values()
+            for start in range(0, len(idx), batch_size)
+        ]
+
+        batch_chords = Parallel(n_jobs=-1, prefer="processes")(
+            delayed(self._analyze_batch)(
+                np.stack([signals[i][0] for i in batch]), signals[batch[0]][1]
+            )
+            for batch in batches
+        )
+        chords: list[str | None] = [None] * len(signals)
+        for batch, result in zip(batches, batch_chords):
+            for i, chord in zip(batch, result):
+                chords[i] = chord
+        return chords
+
+    def _analyze_batch(self, ys: np.ndarray, sr: int) -> list[str | None]:
+        """`analyze_file` for equally long signals stacked as the rows of `ys`."""
+        chords = []
+        for voiced_frames, frame_peaks in pitch_frames_batch(
+            ys, sr, **self._frame_params()
+        ):
+            active_pcs, _, detailed_peaks, _ = aggregate_pitch_frames(
+                voiced_frames, frame_peaks, min_frame_ratio=self.min_frame_ratio
+            )
+            chords.append(identify_chord(active_pcs, detailed_peaks))
+        return chords
+
     # -------- sliding‑window timeline --------
     # Similar to analyze_file, this method is for generating a sequence of chords.
     # It also only needs the final chord string per segment.
@@ -105,54 +215,34 @@ class ChordAnalyzer:
         self, path: str
     ) -> Generator[tuple[float, float, str | None], None, None]:
         y, sr = self.reader(path)
-        hop = int(self.hop_sec * sr)
         win = int(self.win_sec * sr)
-        for start in range(0, len(y) - win + 1, hop):
-            seg = y[start : start + win]
-
-            # active_pitches_array returns active PCs, PC data, detailed peak data, total voiced frames
-            # We only need the active_pitch_classes for identify_chord in this specific method
-            active_pitch_classes, _, detailed_peak_detections, _ = (
-                active_pitches_array(  # Get detailed peaks here too
-                    seg,
-                    sr,
-                    frame_energy_thresh_db=self.frame_energy_thresh_db,
-                    min_frame_ratio=self.min_frame_ratio,
-                    min_prominence_db=self.min_prominence_db,
-                    max_level_diff_db=self.max_level_diff_db,
-                )
-            )
-
-            # Now passing detailed_peak_detections to identify_chord
-            chord = identify_chord(
-                active_pitch_classes, detailed_peak_detections
-            )  # Pass detailed peaks
-
+        for start, seg, voiced_frames, frame_peaks in self._sliding_windows(y, sr):
+            chord = self._analyze_frames(seg, voiced_frames, frame_peaks)[0]
             yield start / sr, (start + win) / sr, chord
 
     def stream_file_live(
         self, path: str
-    ) -> list[
-        Tuple[str | None, set[int], list[dict], list[dict[str, Any]], float, int]
-    ]:
+    ) -> list[Tuple[str | None, int, PCStats, list[dict[str, Any]], float, int]]:
         """
-        Parallel version: analyzes all segments in parallel and returns a list instead of a generator.
+        Analyzes every sliding window and returns a list instead of a generator.
         """
         y, sr = self.reader(path)
-        win = int(self.win_sec * sr)
-        hop = int(self.hop_sec * sr)
-
-        segments = [y[start : start + win] for start in range(0, len(y) - win + 1, hop)]
+        return self.stream_array_live(y, sr)
 
-        results = Parallel(n_jobs=-1, prefer="processes")(
-            delayed(self._analyze_segment)(seg, sr) for seg in segments
-        )
-
-        return results
+    def stream_array_live(
+        self, y: np.ndarray, sr: int
+    ) -> list[Tuple[str | None, int, PCStats, list[dict[str, Any]], float, int]]:
+        """
+        Same as `stream_file_live`, for audio the caller has already loaded.
+        """
+        return [
+            self._analyze_frames(seg, voiced_frames, frame_peaks)
+            for _, seg, voiced_frames, frame_peaks in self._sliding_windows(y, sr)
+        ]
 
     # This is the main method for the mic_analyze CLI
     def stream_mic_live(self, interval_sec: float = 0.05) -> Generator[
-        Tuple[str | None, Set[int], List[Dict], List[Dict[str, Any]], float, int],
+        Tuple[str | None, int, PCStats, List[Dict[str, Any]], float, int],
         None,
         None,
     ]:
@@ -169,7 +259,10 @@ class ChordAnalyzer:
 
         logger.info(f"Waiting for initial buffer ({self.win_sec:.1f} seconds)...")
         buffer_fill_start_time = time.time()
-        while len(reader.get_buffer()) < analysis_window_frames:
+        # The first analysis pays for librosa's lazy imports and numba JIT;
+        # do it now, while the buffer is filling, instead of on the first tick.
+        self.warmup(reader.sr)
+        while reader.frames_written < analysis_window_frames:
             time.sleep(0.01)
             if time.time() - buffer_fill_start_time > 5:
                 logger.warning(
@@ -178,6 +271,8 @@ class ChordAnalyzer:
                 break
 
         logger.info("Buffer filled. Starting analysis.")
+        # The live window is copied into this buffer on every tick
+        seg_buffer = np.empty(analysis_window_frames, dtype=np.float32)
 
         try:
             last_process_time = time.time()
@@ -186,16 +281,17 @@ class ChordAnalyzer:
 
                 if current_time - last_process_time >= process_interval_sec:
 
-                    y = reader.get_buffer()
-                    if len(y) < analysis_window_frames:
+                    seg, _ = reader.get_latest(analysis_window_frames, out=seg_buffer)
+                    if len(seg) < analysis_window_frames:
                         logger.debug(
-                            f"Buffer size ({len(y)}) smaller than window size ({analysis_window_frames}). Waiting..."
+                            f"Buffer size ({len(seg)}) smaller than window size ({analysis_window_frames}). Waiting..."
                         )
                         time.sleep(0.01)
                         continue
 
-                    seg = y[-analysis_window_frames:]
-
+                    # Every window is analysed in full: frames near its right edge
+                    # see the zero padding past the end through the long low-octave
+                    # CQT filters, so their results cannot be carried to the next tick.
                     result_tuple = self._analyze_segment(seg, reader.sr)
 
                     yield result_tuple
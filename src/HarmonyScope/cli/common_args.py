@@ -46,6 +46,12 @@ def add_common_args(ap: argparse.ArgumentParser) -> None:
         metavar="dB",
         help="RMS threshold to mark frame voiced (dB)",
     )
+    group.add_argument(
+        "--backend",
+        choices=["cpu", "cuda"],
+        default="cpu",
+        help="Where to compute the CQT (cuda requires cupy and an NVIDIA GPU)",
+    )
     group.add_argument(
         "-v",
         "--verbose",
@@ -40,10 +40,13 @@ def main() -> None:
         min_prominence_db=args.min_prominence_db,
         max_level_diff_db=args.max_level_diff_db,
         frame_energy_thresh_db=args.frame_energy_thresh_db,
+        backend=args.backend,
         hop_sec=args.interval,
     )
-    frames, hop_sec, win_sec = file_frames.prepare_frames(ana=ana, path=wav_path)
-    viewer.build_gradio_app(frames, hop_sec, win_sec).launch()
+    get_frame, n_frames, hop_sec, win_sec = file_frames.prepare_frames(
+        ana=ana, path=wav_path
+    )
+    viewer.build_gradio_app(get_frame, n_frames, hop_sec, win_sec).launch()
     print(f"🔗 Launching Gradio for: {wav_path.name}")
 
 
@@ -1,6 +1,8 @@
 from HarmonyScope.io.mic_reader import list_input_devices, MicReader
 from HarmonyScope.analyzer.chord_analyzer import ChordAnalyzer
 import argparse, sys
+from functools import lru_cache
+from typing import Tuple
 import questionary
 from questionary import Choice
 from HarmonyScope import set_verbosity
@@ -12,15 +14,23 @@ from HarmonyScope.cli.common_args import add_common_args
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _input_device_titles() -> Tuple[Tuple[int, str], ...]:
+    """(id, menu title) of every input device, queried from PortAudio once."""
+    return tuple((idx, f"[{idx}] {name}") for idx, name in list_input_devices())
+
+
 def choose_device_interactive() -> int:
     """Arrow‑key selector – returns the chosen PortAudio device id."""
-    devices = list_input_devices()
+    devices = _input_device_titles()
     if not devices:
+        # Query again next time, a microphone may have been connected since
+        _input_device_titles.cache_clear()
         raise RuntimeError(
             "No input devices found. Ensure PortAudio is installed and a microphone is connected."
         )
 
-    choices = [Choice(title=f"[{idx}] {name}", value=idx) for idx, name in devices]
+    choices = [Choice(title=title, value=idx) for idx, title in devices]
 
     print("Listing available input devices...")
     try:
@@ -55,6 +65,14 @@ def main():
         default=None,
         help="device id (use --device -1 to list & choose interactively)",
     )
+    ap.add_argument(
+        "--sr",
+        type=int,
+        default=22050,
+        metavar="HZ",
+        help="Recording sample rate; the C1-C8 CQT needs more than 16620 Hz, and "
+        "higher rates only add cost (the device must support the rate)",
+    )
 
     args = ap.parse_args()
 
@@ -69,8 +87,7 @@ def main():
             sys.exit(1)
 
     try:
-        # Default sample rate is 44100
-        sample_rate = 44100
+        sample_rate = args.sr
         logger.info(f"Using device ID: {dev_id}, Sample Rate: {sample_rate}")
         reader = MicReader(
             device=dev_id, sr=sample_rate, maxlen_sec=args.window + 1
@@ -82,6 +99,7 @@ def main():
             min_prominence_db=args.min_prominence_db,
             max_level_diff_db=args.max_level_diff_db,
             frame_energy_thresh_db=args.frame_energy_thresh_db,
+            backend=args.backend,
         )
 
         logger.info(
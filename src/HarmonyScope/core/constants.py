@@ -1,3 +1,5 @@
+import numpy as np
+
 PITCH_CLASS_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 
 CHORD_RELATIONS = [
@@ -21,3 +23,18 @@ CHORD_RELATIONS = [
     ("13", {0, 4, 7, 10, 14, 21}),
 ]
 CHORD_RELATIONS = [(name, {pc % 12 for pc in pcs}) for name, pcs in CHORD_RELATIONS]
+
+# The same relations as 12-bit masks (bit i set = i semitones above the root)
+RELATION_SUFFIXES = [name for name, _ in CHORD_RELATIONS]
+RELATION_MASKS = np.array(
+    [sum(1 << pc for pc in pcs) for _, pcs in CHORD_RELATIONS], dtype=np.uint16
+)
+RELATION_SIZES = np.array([len(pcs) for _, pcs in CHORD_RELATIONS], dtype=np.int8)
+# ROOTED_RELATION_MASKS[root, k]: pitch classes of relation k built on `root`
+ROOTED_RELATION_MASKS = np.array(
+    [
+        [sum(1 << (root + pc) % 12 for pc in pcs) for _, pcs in CHORD_RELATIONS]
+        for root in range(12)
+    ],
+    dtype=np.uint16,
+)
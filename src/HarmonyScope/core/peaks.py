@@ -0,0 +1,177 @@
+"""
+Spectral peak picking for `pitch.pitch_frames`, compiled with numba.
+
+`pick_peaks` applies the per-frame percentile height threshold,
+``scipy.signal.find_peaks(height=..., distance=...)`` and
+``scipy.signal.peak_prominences`` to many CQT frames in one compiled call,
+instead of three NumPy/SciPy calls (each validating its arguments) per frame.
+The results are the same as SciPy's; the only difference is that peaks of
+exactly equal height closer than `distance` are resolved in a stable order,
+where SciPy's quicksort leaves that order unspecified.
+"""
+
+import math
+from typing import Tuple
+import numpy as np
+from numba import njit
+
+
+def pick_peaks(
+    CQT_mag_linear: np.ndarray,
+    frames: np.ndarray,
+    *,
+    height_percentile: float,
+    distance: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Peaks of the given frames (columns) of a magnitude CQT (bins x frames).
+
+    In each frame, peaks must reach `height_percentile` of the frame's positive
+    magnitudes and lie at least `distance` bins apart (the lower of two close
+    peaks is dropped, as in scipy.signal.find_peaks).
+
+    Returns flat ``(peak_frames, peak_bins, prominences)`` arrays ordered by
+    frame, then bin. Prominences are linear, in float64 like SciPy's.
+    """
+    if distance < 1:
+        raise ValueError("`distance` must be greater or equal to 1")
+    frames = np.asarray(frames, dtype=np.int64)
+    # Magnitudes count as positive above 1e-12, compared in their own dtype
+    tiny = CQT_mag_linear.dtype.type(1e-12)
+    quantile = float(np.true_divide(height_percentile, 100))
+    return _pick_peaks(CQT_mag_linear, frames, quantile, math.ceil(distance), tiny)
+
+
+@njit
+def _pick_peaks(C, frames, quantile, distance, tiny):
+    n_bins = C.shape[0]
+    # A local maximum needs a lower bin on each side, so a frame has at most
+    # (n_bins - 1) // 2 of them
+    capacity = len(frames) * max(1, (n_bins - 1) // 2)
+    peak_frames = np.empty(capacity, np.int64)
+    peak_bins = np.empty(capacity, np.int64)
+    prominences = np.empty(capacity, np.float64)
+    n_peaks = 0
+
+    x = np.empty(n_bins, np.float64)
+    values = np.empty(n_bins, C.dtype)
+    candidates = np.empty(n_bins, np.int64)
+    for frame in frames:
+        column = C[:, frame]
+        for i in range(n_bins):
+            x[i] = column[i]
+
+        # Height threshold: np.percentile (linear) of the magnitudes above
+        # `tiny`, interpolated in their dtype as NumPy does, or 0 if none are
+        n = 0
+        for i in range(n_bins):
+            if column[i] > tiny:
+                values[n] = column[i]
+                n += 1
+        height = 0.0
+        if n > 0:
+            virtual = (n - 1) * quantile
+            below = min(int(math.floor(virtual)), n - 1)
+            a = _select(values, n, below)
+            # The next order statistic is the smallest value after the k-th
+            b = a
+            if below + 1 < n:
+                b = values[below + 1]
+                for i in range(below + 2, n):
+                    b = min(b, values[i])
+            gamma = virtual - below
+            # values[0] is reused to hold the weight cast to the magnitudes' dtype
+            if gamma >= 0.5:
+                values[0] = 1.0 - gamma
+                height = float(b - (b - a) * values[0])
+            else:
+                values[0] = gamma
+                height = float(a + (b - a) * values[0])
+
+        # Local maxima (the middle bin of flat peaks) at or above the height
+        m = 0
+        i = 1
+        while i < n_bins - 1:
+            if x[i - 1] < x[i]:
+                i_ahead = i + 1
+                while i_ahead < n_bins - 1 and x[i_ahead] == x[i]:
+                    i_ahead += 1
+                if x[i_ahead] < x[i]:
+                    middle = (i + i_ahead - 1) // 2
+                    if x[middle] >= height:
+                        candidates[m] = middle
+                        m += 1
+                    i = i_ahead
+            i += 1
+
+        # Going from the highest peak down (the later of equal ones first, as
+        # with a stable sort), drop the peaks within `distance`
+        keep = np.ones(m, np.bool_)
+        done = np.zeros(m, np.bool_)
+        while True:
+            j = -1
+            for r in range(m):
+                if keep[r] and not done[r]:
+                    if j < 0 or x[candidates[r]] >= x[candidates[j]]:
+                        j = r
+            if j < 0:
+                break
+            done[j] = True
+            k = j - 1
+            while k >= 0 and candidates[j] - candidates[k] < distance:
+                keep[k] = False
+                k -= 1
+            k = j + 1
+            while k < m and candidates[k] - candidates[j] < distance:
+                keep[k] = False
+                k += 1
+
+        # Prominence: height above the higher of the two minima reached before
+        # the signal rises above the peak (or ends) on either side
+        for j in range(m):
+            if not keep[j]:
+                continue
+            peak = candidates[j]
+            left_min = x[peak]
+            i = peak
+            while i >= 0 and x[i] <= x[peak]:
+                left_min = min(left_min, x[i])
+                i -= 1
+            right_min = x[peak]
+            i = peak
+            while i < n_bins and x[i] <= x[peak]:
+                right_min = min(right_min, x[i])
+                i += 1
+            peak_frames[n_peaks] = frame
+            peak_bins[n_peaks] = peak
+            prominences[n_peaks] = x[peak] - max(left_min, right_min)
+            n_peaks += 1
+
+    return peak_frames[:n_peaks], peak_bins[:n_peaks], prominences[:n_peaks]
+
+
+@njit
+def _select(values, n, k):
+    """
+    Partially order values[:n] so that values[k] is the k-th smallest (from 0),
+    with no larger value before it and no smaller one after it (Wirth's
+    selection); returns values[k].
+    """
+    lo, hi = 0, n - 1
+    while lo < hi:
+        pivot = values[k]
+        i, j = lo, hi
+        while i <= j:
+            while values[i] < pivot:
+                i += 1
+            while pivot < values[j]:
+                j -= 1
+            if i <= j:
+                values[i], values[j] = values[j], values[i]
+                i += 1
+                j -= 1
+        if j < k:
+            lo = i
+        if k < i:
+            hi = j
+    return values[k]
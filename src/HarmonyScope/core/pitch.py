@@ -1,13 +1,31 @@
 import numpy as np
 import librosa
 import logging
-import scipy.signal
-from collections import Counter
-from typing import Set, Tuple, List, Dict, Any  # Import Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import NamedTuple, Tuple, List, Dict, Any, Optional  # Import Dict, Any
 from .constants import PITCH_CLASS_NAMES
+from .cqt import cqt_magnitude
+from .peaks import pick_peaks
 
 logger = logging.getLogger(__name__)
 
+# Using default hop_length for librosa functions (usually 512) for consistent frame counts
+HOP_LENGTH = 512
+
+
+class PCStats(NamedTuple):
+    """Per pitch class aggregates of one window; the arrays are indexed by pitch class (0-11)."""
+
+    detection_count: np.ndarray  # frames each PC was detected in (any octave)
+    total_contributions: np.ndarray  # peaks found for each PC across all octaves
+    active: np.ndarray  # bool, the PCs set in the active mask
+    avg_prominence_db: np.ndarray  # -inf for PCs without detections
+    avg_peak_level_db: np.ndarray  # -inf for PCs without detections
+    avg_level_diff_db: np.ndarray  # +inf for PCs without detections
+    min_required_frames: int  # frames a PC needs to be active
+    total_voiced_frames: int
+
 
 def active_pitches_array(
     y,
@@ -20,11 +38,15 @@ def active_pitches_array(
     min_prominence_db=8,  # Peaks must have this minimum prominence in dB (relative to local spectral floor)
     max_level_diff_db=15,  # Peaks must be within this many dB of the loudest peak in the frame
     peak_distance_bins=3,  # Minimum horizontal distance (in CQT bins) between peaks
+    backend="cpu",  # "cpu" (librosa) or "cuda" (cupy, see pitch_gpu)
+    memoize_cqt=False,  # Keep the CQT in _CQT_CACHE (for audio analysed more than once)
 ):
     """
     Identify active pitch classes (0-11) using spectral peak picking, prominence,
     and relative level filtering, aggregating results across octaves.
 
+    This is `pitch_frames` followed by `aggregate_pitch_frames` over all frames of `y`.
+
     Args:
         y (np.ndarray): Audio waveform.
         sr (int): Sampling rate.
@@ -39,225 +61,400 @@ def active_pitches_array(
         max_level_diff_db (float): Maximum allowed difference (in dB) between a peak's
                                    level and the maximum peak level within the frame.
         peak_distance_bins (int): Minimum horizontal distance (in CQT bins) between peaks.
+        backend (str): "cpu" computes the CQT with librosa, "cuda" on the GPU
+                       with `pitch_gpu.cqt_magnitude` (requires cupy).
+        memoize_cqt (bool): Look up and keep the CQT in `_CQT_CACHE`, for callers
+                            that may analyse the same samples again (whole files).
 
     Returns:
-        Tuple[Set[int], List[Dict], List[Dict[str, Any]], int]: A tuple containing:
-            - A set of active pitch class indices (0-11).
-            - A list of 12 dictionaries, one for each pitch class (0-11),
-              with aggregated debug information ('pc', 'name', 'detection_count',
-              'avg_prominence_db', 'avg_peak_level_db', 'avg_level_diff_db', 'active').
-              Includes 'min_required_frames', 'total_voiced_frames'.
+        Tuple[int, PCStats, List[Dict[str, Any]], int]: A tuple containing:
+            - A 12-bit mask of the active pitch classes (bit i set = pitch class i).
+            - A `PCStats` of aggregated debug information, with one array entry per
+              pitch class (0-11) for the frame and peak counts, the active flags
+              and the average prominence, level and level difference.
             - A list of dictionaries, where each dictionary represents a single
               detected spectral peak (note detection) including its MIDI note,
               pitch class, octave, frequency, and metrics within its frame.
             - The total count of voiced CQT frames processed.
     """
-    # Using default hop_length for librosa functions (usually 512) for consistent frame counts
-    hop_length = 512
+    voiced_frames, frame_peaks = pitch_frames(
+        y,
+        sr,
+        frame_energy_thresh_db=frame_energy_thresh_db,
+        cqt_bins_per_octave=cqt_bins_per_octave,
+        peak_height_percentile=peak_height_percentile,
+        min_prominence_db=min_prominence_db,
+        max_level_diff_db=max_level_diff_db,
+        peak_distance_bins=peak_distance_bins,
+        backend=backend,
+        memoize_cqt=memoize_cqt,
+    )
+    return aggregate_pitch_frames(
+        voiced_frames, frame_peaks, min_frame_ratio=min_frame_ratio
+    )
 
-    # 1. frame RMS to find voiced frames
-    rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
-    rms_db = librosa.amplitude_to_db(rms, ref=1e-9)
-    voiced_rms_frames = rms_db > frame_energy_thresh_db
 
-    # Handle case with no audio or silence
-    if np.all(~voiced_rms_frames):
+def pitch_frames(
+    y,
+    sr,
+    *,
+    frame_energy_thresh_db=-40,
+    cqt_bins_per_octave=24,
+    peak_height_percentile=90,
+    min_prominence_db=8,
+    max_level_diff_db=15,
+    peak_distance_bins=3,
+    backend="cpu",
+    memoize_cqt=False,
+) -> Tuple[np.ndarray, List[Optional[List[Dict[str, Any]]]]]:
+    """
+    Per-frame stage of `active_pitches_array`: voiced-frame flags and the spectral
+    peaks that pass the prominence and level filters in each CQT frame.
+
+    Nothing here depends on which analysis window a frame belongs to, so a long
+    signal can be processed once and overlapping windows aggregated from slices
+    of the result (frame i is centred on sample ``i * HOP_LENGTH``).
+
+    Returns:
+        Tuple[np.ndarray, List[Optional[List[Dict[str, Any]]]]]:
+            - Boolean array, True for voiced frames.
+            - One entry per frame: None if the frame produced no peaks, else a list
+              of peak dicts ('midi_note', 'pc', 'octave', 'freq', 'prominence_db',
+              'peak_level_db', 'level_diff_db').
+    """
+    return pitch_frames_batch(
+        np.asarray(y, dtype=np.float32)[np.newaxis],
+        sr,
+        frame_energy_thresh_db=frame_energy_thresh_db,
+        cqt_bins_per_octave=cqt_bins_per_octave,
+        peak_height_percentile=peak_height_percentile,
+        min_prominence_db=min_prominence_db,
+        max_level_diff_db=max_level_diff_db,
+        peak_distance_bins=peak_distance_bins,
+        backend=backend,
+        memoize_cqt=memoize_cqt,
+    )[0]
+
+
+def pitch_frames_batch(
+    ys,
+    sr,
+    *,
+    frame_energy_thresh_db=-40,
+    cqt_bins_per_octave=24,
+    peak_height_percentile=90,
+    min_prominence_db=8,
+    max_level_diff_db=15,
+    peak_distance_bins=3,
+    backend="cpu",
+    memoize_cqt=False,
+) -> List[Tuple[np.ndarray, List[Optional[List[Dict[str, Any]]]]]]:
+    """
+    `pitch_frames` for several equally long signals stacked as the rows of `ys`
+    (shape ``(n_signals, n_samples)``), returning one result per row.
+
+    The CQT of all voiced rows is computed in a single call, so its filter basis
+    is built once for the batch. With `memoize_cqt` it is kept in `_CQT_CACHE`
+    and reused when the same samples are analysed again. Rows are not padded:
+    zero-padding a signal changes its last CQT frames, so only signals of the
+    same length can share a batch.
+    """
+    hop_length = HOP_LENGTH
+    # The CQT, RMS and dB levels follow the dtype of the audio; float32 is ample
+    # for the dynamic range involved, so float64 input is not carried through.
+    ys = np.asarray(ys, dtype=np.float32)
+
+    # 1. frame RMS to find voiced frames
+    # Same as librosa.amplitude_to_db(rms, ref=1e-9) > frame_energy_thresh_db for
+    # each row, compared in the power domain: amplitude_to_db floors its input
+    # (and so the 1e-9 ref) at 1e-5, i.e. 1e-10 in power, and clips every row
+    # at 80 dB below its loudest frame.
+    voiced_power = 10.0 ** ((frame_energy_thresh_db - 100.0) / 10.0)
+
+    # A frame's RMS never exceeds the peak amplitude of its signal, so when every
+    # peak is below the threshold (with a 2x power margin for float32 rounding)
+    # no frame can be voiced and the RMS is not needed either.
+    peak = np.max(np.abs(ys), axis=-1, initial=0.0)
+    if np.all(
+        np.maximum(2.0 * np.square(peak, dtype=np.float64), 1e-10) <= voiced_power
+    ):
+        logger.debug("Signal peak below energy threshold, no voiced frames.")
+        n_frames = 1 + ys.shape[-1] // hop_length
+        return [(np.zeros(n_frames, dtype=bool), [None] * n_frames) for _ in ys]
+
+    rms = _frame_rms(ys, hop_length)
+    power = np.maximum(np.square(rms, dtype=np.float64), 1e-10)
+    np.maximum(power, power.max(axis=-1, keepdims=True) * 1e-8, out=power)
+    voiced = power > voiced_power
+    results = [(v, [None] * len(v)) for v in voiced]
+
+    # Handle case with no audio or silence (such rows skip the CQT entirely). An
+    # all-zero row has an all-zero CQT and so no peaks, even if the 1e-10 floor
+    # above makes its frames count as voiced at thresholds below 0 dB.
+    rows = np.flatnonzero(voiced.any(axis=-1) & (peak > 0))
+    if not len(rows):
         logger.debug("No voiced frames detected within energy threshold.")
-        # Return empty set, a list of 12 zero-filled dicts, an empty peak list, and 0 voiced frames
-        table_data = []
-        for i, name in enumerate(PITCH_CLASS_NAMES):
-            table_data.append(
-                {
-                    "pc": i,
-                    "name": name,
-                    "detection_count": 0,
-                    "avg_prominence_db": -np.inf,
-                    "avg_peak_level_db": -np.inf,
-                    "avg_level_diff_db": np.inf,
-                    "active": False,
-                    "min_required_frames": 0,
-                    "total_voiced_frames": 0,
-                }
-            )
-        return set(), table_data, [], 0  # Return empty list for peak detections
-
-    # 2. Compute CQT magnitude (linear and dB)
+        return results
+
+    # 2. Compute CQT magnitude
     fmin = librosa.midi_to_hz(36)  # C1
     n_bins = int(7 * cqt_bins_per_octave)  # C1 to C8
 
-    CQT = librosa.cqt(
-        y=y,
-        sr=sr,
+    CQT_mag = _cqt_magnitude(
+        ys[rows],
+        sr,
         hop_length=hop_length,
         bins_per_octave=cqt_bins_per_octave,
         fmin=fmin,
         n_bins=n_bins,
+        backend=backend,
+        memoize=memoize_cqt,
+    )
+    for i, CQT_mag_linear in zip(rows, CQT_mag):
+        results[i] = _frame_peaks(
+            CQT_mag_linear,
+            voiced[i],
+            frame_energy_thresh_db=frame_energy_thresh_db,
+            cqt_bins_per_octave=cqt_bins_per_octave,
+            peak_height_percentile=peak_height_percentile,
+            min_prominence_db=min_prominence_db,
+            max_level_diff_db=max_level_diff_db,
+            peak_distance_bins=peak_distance_bins,
+        )
+    return results
+
+
+def _frame_rms(ys: np.ndarray, hop_length: int, frame_length: int = 2048) -> np.ndarray:
+    """
+    ``librosa.feature.rms(y=ys, hop_length=hop_length)[..., 0, :]``: centred,
+    zero-padded frames reduced with one einsum over a strided view, instead of
+    librosa's squared copy of every (4x overlapping) frame.
+    """
+    pad_width = [(0, 0)] * (ys.ndim - 1) + [(frame_length // 2, frame_length // 2)]
+    frames = np.lib.stride_tricks.sliding_window_view(
+        np.pad(ys, pad_width), frame_length, axis=-1
+    )[..., ::hop_length, :]
+    sum_sq = np.einsum("...ij,...ij->...i", frames, frames)
+    return np.sqrt(sum_sq / frame_length, out=sum_sq)
+
+
+# Recently computed CQT magnitudes, keyed by a hash of the input samples and the
+# CQT parameters. Analysing the same audio twice (e.g. analyze_file and timeline
+# on one file, which FileReader hands out as the same cached array) then runs
+# the CQT only once. Callers opt in: live windows never repeat, and hashing them
+# on every tick would be wasted work.
+_CQT_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_CQT_CACHE_SIZE = 4
+
+
+def _cqt_magnitude(ys, sr, *, backend, memoize, **cqt_kwargs) -> np.ndarray:
+    """|CQT| of the rows of `ys` on the chosen backend, memoised in `_CQT_CACHE`."""
+    if not memoize:
+        return _compute_cqt_magnitude(ys, sr, backend=backend, **cqt_kwargs)
+
+    ys = np.ascontiguousarray(ys)
+    key = (
+        hashlib.blake2b(ys.data, digest_size=16).digest(),
+        ys.shape,
+        ys.dtype.str,
+        sr,
+        backend,
+        tuple(sorted(cqt_kwargs.items())),
+    )
+    CQT_mag = _CQT_CACHE.get(key)
+    if CQT_mag is not None:
+        _CQT_CACHE.move_to_end(key)
+        return CQT_mag
+
+    CQT_mag = _compute_cqt_magnitude(ys, sr, backend=backend, **cqt_kwargs)
+    CQT_mag.flags.writeable = False  # shared between callers
+
+    _CQT_CACHE[key] = CQT_mag
+    if len(_CQT_CACHE) > _CQT_CACHE_SIZE:
+        _CQT_CACHE.popitem(last=False)
+    return CQT_mag
+
+
+def _compute_cqt_magnitude(ys, sr, *, backend, **cqt_kwargs) -> np.ndarray:
+    """|CQT| of the rows of `ys` on the chosen backend."""
+    if backend == "cuda":
+        from . import pitch_gpu
+
+        return pitch_gpu.cqt_magnitude(ys, sr, **cqt_kwargs)
+    return cqt_magnitude(ys, sr, **cqt_kwargs)
+
+
+def _frame_peaks(
+    CQT_mag_linear: np.ndarray,
+    voiced_rms_frames: np.ndarray,
+    *,
+    frame_energy_thresh_db,
+    cqt_bins_per_octave,
+    peak_height_percentile,
+    min_prominence_db,
+    max_level_diff_db,
+    peak_distance_bins,
+) -> Tuple[np.ndarray, List[Optional[List[Dict[str, Any]]]]]:
+    """Peak picking of `pitch_frames` on one signal's CQT magnitude (bins x frames)."""
+    # Loudest bin of every frame, in one pass over the CQT
+    frame_max_linear = CQT_mag_linear.max(axis=0)
+
+    # Peak levels are converted to dB only where they are needed. The top_db
+    # clip of amplitude_to_db is relative to the loudest bin of the whole CQT,
+    # and since log is monotonic that floor needs just one log of the maximum.
+    level_floor_db = (
+        librosa.amplitude_to_db(
+            frame_max_linear.max(keepdims=True), ref=1e-9, top_db=None
+        )[0]
+        - 80.0
     )
-    CQT_mag_linear = np.abs(CQT)
-    CQT_mag_db = librosa.amplitude_to_db(CQT_mag_linear, ref=1e-9)
 
     # Ensure CQT and RMS have compatible number of frames
     min_frames = min(CQT_mag_linear.shape[1], len(voiced_rms_frames))
     CQT_mag_linear = CQT_mag_linear[:, :min_frames]
-    CQT_mag_db = CQT_mag_db[:, :min_frames]
     voiced_rms_frames = voiced_rms_frames[:min_frames]
+    frame_max_linear = frame_max_linear[:min_frames]
 
     # Get CQT frequencies and map to MIDI notes
     cqt_freqs = librosa.cqt_frequencies(
-        n_bins=CQT.shape[0], fmin=fmin, bins_per_octave=cqt_bins_per_octave
+        n_bins=CQT_mag_linear.shape[0],
+        fmin=librosa.midi_to_hz(36),
+        bins_per_octave=cqt_bins_per_octave,
     )
     cqt_midi = librosa.hz_to_midi(cqt_freqs)
+    # Filter out potential NaNs or out-of-range MIDI values from conversion
+    valid_bins = ((cqt_midi >= 0) & (cqt_midi <= 127)).tolist()
+    cqt_midi_notes = np.round(np.nan_to_num(cqt_midi)).astype(int).tolist()
 
-    # --- Data structures to aggregate per Pitch Class (0-11) ---
-    pc_detection_counts = Counter()  # Count frames where PC was detected
-    pc_prominence_sums = Counter()
-    pc_peak_level_sums = Counter()
-    pc_level_diff_sums = Counter()
-    pc_contributions_count = (
-        Counter()
-    )  # Track how many peak detections contributed to sums per PC
-
-    # --- Data structure to collect individual peak detections across all frames ---
-    all_peak_detections: List[Dict[str, Any]] = []
-
-    voiced_cqt_frames_count = 0
-
-    for frame_idx in range(CQT_mag_linear.shape[1]):
-        if voiced_rms_frames[frame_idx]:
-            voiced_cqt_frames_count += 1
-            frame_mag_linear = CQT_mag_linear[:, frame_idx]
-            frame_mag_db = CQT_mag_db[:, frame_idx]
-
-            if np.max(frame_mag_linear) < librosa.db_to_amplitude(
-                frame_energy_thresh_db + 5, ref=1e-9
-            ):
-                logger.debug(f"Frame {frame_idx}: Low energy, skipping peak detection.")
-                continue
-
-            peak_threshold_linear = 0
-            if np.max(frame_mag_linear) > 1e-12:
-                # Only consider positive magnitudes for percentile calculation
-                positive_mags = frame_mag_linear[frame_mag_linear > 1e-12]
-                if len(positive_mags) > 0:
-                    peak_threshold_linear = np.percentile(
-                        positive_mags, peak_height_percentile
-                    )
+    frame_peaks: List[Optional[List[Dict[str, Any]]]] = [None] * min_frames
+
+    # Loudest CQT bin a voiced frame needs for peak detection (same for every frame)
+    min_frame_peak_linear = librosa.db_to_amplitude(
+        frame_energy_thresh_db + 5, ref=1e-9
+    )
+
+    # Only voiced frames whose loudest bin reaches the threshold are searched
+    # for peaks; the rest are skipped as low energy without entering the loop.
+    searched = voiced_rms_frames & (frame_max_linear >= min_frame_peak_linear)
+    if logger.isEnabledFor(logging.DEBUG):
+        skipped = voiced_rms_frames & ~searched
+        logger.debug(
+            f"{np.count_nonzero(skipped)} voiced frames: low energy, skipping peak detection."
+        )
+
+    # Percentile height threshold, find_peaks and peak_prominences of every
+    # searched frame in one compiled pass; the outputs are flat over all frames.
+    searched_frames = np.flatnonzero(searched)
+    peak_frames, peak_bins, prominences_linear = pick_peaks(
+        CQT_mag_linear,
+        searched_frames,
+        height_percentile=peak_height_percentile,
+        distance=peak_distance_bins,
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for frame_idx in np.setdiff1d(searched_frames, peak_frames).tolist():
+            logger.debug(f"Frame {frame_idx}: No initial peaks found.")
+
+    # The top_db clip of amplitude_to_db applies within each frame's prominences
+    prominences_db = librosa.amplitude_to_db(prominences_linear, ref=1e-9, top_db=None)
+    prominences_db = np.maximum(
+        prominences_db, _max_per_frame(prominences_db, peak_frames) - 80.0
+    )
+
+    prominent = prominences_db >= min_prominence_db
+    if logger.isEnabledFor(logging.DEBUG):
+        for frame_idx in np.setdiff1d(peak_frames, peak_frames[prominent]).tolist():
+            logger.debug(f"Frame {frame_idx}: No peaks passed prominence filter.")
+    peak_frames = peak_frames[prominent]
+    peak_bins = peak_bins[prominent]
+    prominences_db = prominences_db[prominent]
+
+    peak_levels_db = np.maximum(
+        librosa.amplitude_to_db(
+            CQT_mag_linear[peak_bins, peak_frames], ref=1e-9, top_db=None
+        ),
+        level_floor_db,
+    )
+    level_diffs_db = _max_per_frame(peak_levels_db, peak_frames) - peak_levels_db
+
+    # Keep the peaks within max_level_diff_db of the loudest peak in their frame
+    close = level_diffs_db <= max_level_diff_db
+
+    # Convert final filtered CQT bin indices to MIDI notes and then Pitch Classes
+    for frame_idx, peak_bin, prominence_db, peak_level_db, level_diff_db in zip(
+        peak_frames[close].tolist(),
+        peak_bins[close].tolist(),
+        prominences_db[close],
+        peak_levels_db[close],
+        level_diffs_db[close],
+    ):
+        if not valid_bins[peak_bin]:
+            continue
+        midi_note = cqt_midi_notes[peak_bin]
+        pc = midi_note % 12
+        # MIDI note to octave: C0 is MIDI 12. Octave = (MIDI - 12) // 12
+        octave = (
+            (midi_note - 12) // 12 if midi_note >= 12 else -1
+        )  # Handle notes below C0 if they somehow appear
+
+        # Collect individual peak detection details
+        peak_info = {
+            "midi_note": midi_note,
+            "pc": pc,
+            "octave": octave,
+            "freq": cqt_freqs[peak_bin],  # Use the actual frequency
+            "prominence_db": prominence_db,
+            "peak_level_db": peak_level_db,
+            "level_diff_db": level_diff_db,
+        }
+        if frame_peaks[frame_idx] is None:
+            frame_peaks[frame_idx] = []
+        frame_peaks[frame_idx].append(peak_info)
+
+    return voiced_rms_frames, frame_peaks
 
-            initial_peaks, _ = scipy.signal.find_peaks(
-                frame_mag_linear,
-                height=peak_threshold_linear,
-                distance=peak_distance_bins,
-            )
-
-            if len(initial_peaks) == 0:
-                logger.debug(f"Frame {frame_idx}: No initial peaks found.")
-                continue
-
-            prominences_linear, _, _ = scipy.signal.peak_prominences(
-                frame_mag_linear, initial_peaks
-            )
-            prominences_db = librosa.amplitude_to_db(prominences_linear, ref=1e-9)
-
-            prominence_filtered_indices = initial_peaks[
-                prominences_db >= min_prominence_db
-            ]
-            prominence_filtered_prominences_db = prominences_db[
-                prominences_db >= min_prominence_db
-            ]
-
-            prominence_filtered_peak_levels_db = frame_mag_db[
-                prominence_filtered_indices
-            ]
-
-            if len(prominence_filtered_peak_levels_db) > 0:
-                max_peak_level_db_in_frame = np.max(prominence_filtered_peak_levels_db)
-                level_diffs_db = (
-                    max_peak_level_db_in_frame - prominence_filtered_peak_levels_db
-                )
-                final_filtered_indices = prominence_filtered_indices[
-                    level_diffs_db <= max_level_diff_db
-                ]
-
-                # Get corresponding metrics for the final filtered peaks
-                final_filtered_prominences_db = prominence_filtered_prominences_db[
-                    level_diffs_db <= max_level_diff_db
-                ]
-                final_filtered_levels_db = prominence_filtered_peak_levels_db[
-                    level_diffs_db <= max_level_diff_db
-                ]
-                final_filtered_level_diffs_db = level_diffs_db[
-                    level_diffs_db <= max_level_diff_db
-                ]
-
-            else:
-                logger.debug(f"Frame {frame_idx}: No peaks passed prominence filter.")
-                continue
-
-            # Convert final filtered CQT bin indices to MIDI notes and then Pitch Classes
-            frame_detected_pcs = set()
-            for i, peak_bin in enumerate(final_filtered_indices):
-                if 0 <= peak_bin < len(cqt_midi):
-                    midi_note_float = cqt_midi[peak_bin]
-                    # Filter out potential NaNs or out-of-range MIDI values from conversion
-                    if not np.isnan(midi_note_float) and 0 <= midi_note_float <= 127:
-                        midi_note = round(midi_note_float)
-                        pc = midi_note % 12
-                        # MIDI note to octave: C0 is MIDI 12. Octave = (MIDI - 12) // 12
-                        octave = (
-                            (midi_note - 12) // 12 if midi_note >= 12 else -1
-                        )  # Handle notes below C0 if they somehow appear
-
-                        # Add PC to the set detected in THIS frame (for frame count)
-                        frame_detected_pcs.add(pc)
-
-                        # Collect individual peak detection details
-                        peak_info = {
-                            "frame_idx": frame_idx,
-                            "midi_note": midi_note,
-                            "pc": pc,
-                            "octave": octave,
-                            "freq": cqt_freqs[peak_bin],  # Use the actual frequency
-                            "prominence_db": final_filtered_prominences_db[i],
-                            "peak_level_db": final_filtered_levels_db[i],
-                            "level_diff_db": final_filtered_level_diffs_db[i],
-                        }
-                        all_peak_detections.append(peak_info)
-
-                        # Aggregate metrics per PC (can have multiple contributions per frame across octaves)
-                        pc_prominence_sums[pc] += final_filtered_prominences_db[i]
-                        pc_peak_level_sums[pc] += final_filtered_levels_db[i]
-                        pc_level_diff_sums[pc] += final_filtered_level_diffs_db[i]
-                        pc_contributions_count[
-                            pc
-                        ] += 1  # Increment contribution count for this PC
-
-            # Increment the frame count for each PC detected in this frame
-            pc_detection_counts.update(frame_detected_pcs)  # THIS counts frames
+
+def _max_per_frame(values: np.ndarray, peak_frames: np.ndarray) -> np.ndarray:
+    """For each of `values`, the maximum over the values of its frame (frames sorted)."""
+    if len(values) == 0:
+        return values
+    starts = np.flatnonzero(np.diff(peak_frames, prepend=-1))
+    return np.repeat(
+        np.maximum.reduceat(values, starts), np.diff(starts, append=len(values))
+    )
+
+
+def aggregate_pitch_frames(
+    voiced_frames: np.ndarray,
+    frame_peaks: List[Optional[List[Dict[str, Any]]]],
+    *,
+    min_frame_ratio=0.3,
+) -> Tuple[int, PCStats, List[Dict[str, Any]], int]:
+    """
+    Window stage of `active_pitches_array`: aggregate `pitch_frames` output
+    (or a slice of it) into active pitch classes. Peak 'frame_idx' values are
+    relative to the first frame passed in. Returns the same tuple as
+    `active_pitches_array`.
+    """
+    voiced_cqt_frames_count = int(np.count_nonzero(voiced_frames))
+
+    # --- Collect individual peak detections across all frames ---
+    all_peak_detections: List[Dict[str, Any]] = [
+        {"frame_idx": frame_idx, **peak}
+        for frame_idx, peaks in enumerate(frame_peaks)
+        if peaks is not None
+        for peak in peaks
+    ]
 
     # --- Aggregate detections and determine active Pitch Classes ---
 
     # Handle case where no voiced CQT frames had significant peaks after filtering
     if (
         voiced_cqt_frames_count == 0 and not all_peak_detections
-    ):  # pc_detection_counts would be empty too
+    ):  # so there is nothing to aggregate
         logger.debug("No MIDI notes detected in any voiced frames after filtering.")
-        # Return empty set, a list of 12 zero-filled dicts, an empty peak list, and 0 voiced frames
-        table_data = []
-        for i, name in enumerate(PITCH_CLASS_NAMES):
-            table_data.append(
-                {
-                    "pc": i,
-                    "name": name,
-                    "detection_count": 0,
-                    "avg_prominence_db": -np.inf,
-                    "avg_peak_level_db": -np.inf,
-                    "avg_level_diff_db": np.inf,
-                    "active": False,
-                    "min_required_frames": 0,
-                    "total_voiced_frames": 0,
-                }
-            )
-        return set(), table_data, [], 0  # Return empty list for peak detections
+        # Return an empty mask, zero-filled PC stats, an empty peak list, and 0 voiced frames
+        return 0, _empty_pc_stats(), [], 0
 
     # Calculate minimum required *frames* for a PC to be active
     min_required_frames = int(voiced_cqt_frames_count * min_frame_ratio)
@@ -266,83 +463,69 @@ def active_pitches_array(
         min_required_frames = 1
     # If no voiced frames, min_required_frames remains 0, correctly yielding no active PCs
 
-    active_pitch_classes = set()
-    table_data = []  # List of 12 dicts, one per PC
-
-    # Populate table_data for all 12 pitch classes
-    for pc in range(12):
-        name = PITCH_CLASS_NAMES[pc]
-        frame_count = pc_detection_counts.get(
-            pc, 0
-        )  # Number of frames this PC was detected in
-        total_contributions = pc_contributions_count.get(
-            pc, 0
-        )  # Total number of peaks found for this PC across all octaves
-
-        # Calculate averages (handle case where PC was never detected)
-        avg_prominence_db = (
-            pc_prominence_sums.get(pc, 0) / total_contributions
-            if total_contributions > 0
-            else -np.inf
+    # --- Aggregate per Pitch Class (0-11) with bincount over the detections ---
+    n_peaks = len(all_peak_detections)
+    pcs = np.fromiter((d["pc"] for d in all_peak_detections), np.intp, n_peaks)
+    frame_ids = np.fromiter(
+        (d["frame_idx"] for d in all_peak_detections), np.intp, n_peaks
+    )
+    # Total number of peaks found per PC across all octaves
+    contributions = np.bincount(pcs, minlength=12)
+    # Number of frames each PC was detected in (distinct (frame, pc) pairs)
+    frame_counts = np.bincount(np.unique(frame_ids * 12 + pcs) % 12, minlength=12)
+
+    # Averages per PC; PCs that were never detected get -inf (+inf for the diff)
+    averages = {}
+    for key, default in (
+        ("prominence_db", -np.inf),
+        ("peak_level_db", -np.inf),
+        ("level_diff_db", np.inf),
+    ):
+        sums = np.bincount(
+            pcs,
+            weights=np.fromiter((d[key] for d in all_peak_detections), float, n_peaks),
+            minlength=12,
         )
-        avg_peak_level_db = (
-            pc_peak_level_sums.get(pc, 0) / total_contributions
-            if total_contributions > 0
-            else -np.inf
+        averages[key] = np.divide(
+            sums, contributions, out=np.full(12, default), where=contributions > 0
         )
-        avg_level_diff_db = (
-            pc_level_diff_sums.get(pc, 0) / total_contributions
-            if total_contributions > 0
-            else np.inf
-        )  # Use +inf as default diff
-
-        # A pitch class is active if its frame count meets the threshold
-        # Only consider a PC active if there was at least one contribution/detection,
-        # and the frame count meets the minimum required frames.
-        is_active = (total_contributions > 0) and (frame_count >= min_required_frames)
 
-        if is_active:
-            active_pitch_classes.add(pc)
-
-        info = {
-            "pc": pc,
-            "name": name,
-            "detection_count": frame_count,  # This is the frame count
-            "total_contributions": total_contributions,  # Total peaks detected for this PC across octaves
-            "min_required_frames": min_required_frames,
-            "total_voiced_frames": voiced_cqt_frames_count,
-            "active": is_active,
-            "avg_prominence_db": avg_prominence_db,
-            "avg_peak_level_db": avg_peak_level_db,
-            "avg_level_diff_db": avg_level_diff_db,
-        }
-        table_data.append(info)
-
-    # Sort table data by pitch class index (C, C#, ...) for consistent order
-    table_data.sort(key=lambda x: x["pc"])
+    # A pitch class is active if there was at least one detection and its frame
+    # count meets the minimum required frames. The bitmask is built with plain
+    # ints (12 entries are not worth NumPy).
+    active = (contributions > 0) & (frame_counts >= min_required_frames)
+    active_pc_mask = 0
+    for pc in np.flatnonzero(active).tolist():
+        active_pc_mask |= 1 << pc
+
+    pc_stats = PCStats(
+        detection_count=frame_counts,
+        total_contributions=contributions,
+        active=active,
+        avg_prominence_db=averages["prominence_db"],
+        avg_peak_level_db=averages["peak_level_db"],
+        avg_level_diff_db=averages["level_diff_db"],
+        min_required_frames=min_required_frames,
+        total_voiced_frames=voiced_cqt_frames_count,
+    )
 
     # Sort individual peak detections by MIDI note for consistent display order
     all_peak_detections.sort(key=lambda x: x["midi_note"])
 
     if logger.isEnabledFor(logging.DEBUG):
         logger.debug(
-            f"Active Pitch Classes debug dump (min frames: {min_required_frames}/{voiced_cqt_frames_count}, min prom: {min_prominence_db:.1f}dB, max diff: {max_level_diff_db:.1f}dB):"
+            f"Active Pitch Classes debug dump (min frames: {min_required_frames}/{voiced_cqt_frames_count}):"
         )
         if voiced_cqt_frames_count > 0:
-            for pitch_info in table_data:
-                flag = "✔" if pitch_info["active"] else " "
-                # Ensure denominator is not zero before calculating ratio
-                ratio = (
-                    pitch_info["detection_count"] / pitch_info["total_voiced_frames"]
-                    if pitch_info["total_voiced_frames"] > 0
-                    else 0
-                )
+            for pc, name in enumerate(PITCH_CLASS_NAMES):
+                flag = "✔" if pc_stats.active[pc] else " "
+                ratio = pc_stats.detection_count[pc] / voiced_cqt_frames_count
                 logger.debug(
-                    f"{pitch_info['name']:>2}: Frames: {pitch_info['detection_count']:3} ({ratio:.1%}), "
-                    f"Contribs: {pitch_info['total_contributions']:3}, "
-                    f"Prom Avg: {pitch_info['avg_prominence_db']:5.1f}dB, "
-                    f"Level Avg: {pitch_info['avg_peak_level_db']:5.1f}dB, "
-                    f"Diff Avg: {pitch_info['avg_level_diff_db']:5.1f}dB {flag}"
+                    f"{name:>2}: Frames: {pc_stats.detection_count[pc]:3} ({ratio:.1%}), "
+                    f"Contribs: {pc_stats.total_contributions[pc]:3}, "
+                    f"Prom Avg: {pc_stats.avg_prominence_db[pc]:5.1f}dB, "
+                    f"Level Avg: {pc_stats.avg_peak_level_db[pc]:5.1f}dB, "
+                    f"Diff Avg: {pc_stats.avg_level_diff_db[pc]:5.1f}dB {flag}"
                 )
 
             # Log some details about individual peak detections if there are many
@@ -359,11 +542,25 @@ def active_pitches_array(
         else:
             logger.debug("No voiced frames to report detections.")
 
-    # Return the set of active Pitch Classes, the 12-entry table data,
+    # Return the mask of active Pitch Classes, the per-PC stats,
     # the list of individual peak detections, and total voiced frame count
     return (
-        active_pitch_classes,
-        table_data,
+        active_pc_mask,
+        pc_stats,
         all_peak_detections,
         voiced_cqt_frames_count,
     )
+
+
+def _empty_pc_stats() -> PCStats:
+    """Zero-filled pitch-class stats for windows without any detections."""
+    return PCStats(
+        detection_count=np.zeros(12, dtype=np.intp),
+        total_contributions=np.zeros(12, dtype=np.intp),
+        active=np.zeros(12, dtype=bool),
+        avg_prominence_db=np.full(12, -np.inf),
+        avg_peak_level_db=np.full(12, -np.inf),
+        avg_level_diff_db=np.full(12, np.inf),
+        min_required_frames=0,
+        total_voiced_frames=0,
+    )
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 import librosa
 import numpy as np
@@ -5,9 +6,25 @@ from typing import Tuple
 
 
 class FileReader:
-    def __init__(self, sr=None):
+    # Pitch analysis tops out at C8 (~4.2 kHz), so 22.05 kHz keeps every CQT
+    # bin below Nyquist while halving the samples of 44.1/48 kHz sources.
+    # Pass sr=None to keep the file's native rate.
+    def __init__(self, sr=22050):
         self.sr = sr
 
     def __call__(self, path: str | Path) -> Tuple[np.ndarray, int]:
-        y, sr = librosa.load(path, sr=self.sr)
-        return y, sr
+        """
+        Decode `path` and return ``(y, sr)``. The last few decoded files are cached,
+        so repeated calls share one array: `y` is read-only, and callers that
+        need to modify it must take a copy.
+        """
+        path = Path(path).expanduser().resolve()
+        # Keyed on mtime so an edited file is decoded again instead of served stale
+        return _load(str(path), path.stat().st_mtime_ns, self.sr)
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, mtime_ns: int, sr: int | None) -> Tuple[np.ndarray, int]:
+    y, sr = librosa.load(path, sr=sr)
+    y.flags.writeable = False  # the same array is handed to every caller
+    return y, sr
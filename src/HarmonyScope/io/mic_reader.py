@@ -1,7 +1,6 @@
 import sounddevice as sd
 import numpy as np
 from typing import Tuple
-from collections import deque
 import threading
 
 
@@ -29,9 +28,11 @@ class MicReader:
         self.device = device
         self.sr = sr
         self.maxlen_frames = int(maxlen_sec * sr)  # 計算 buffer 的 frame 數
-        self.buffer = deque(maxlen=self.maxlen_frames)  # buffer 用 deque 固定長度
+        # Preallocated ring buffer; sample n lives at index n % maxlen_frames
+        self._ring = np.zeros(self.maxlen_frames, dtype=np.float32)
         self.lock = threading.Lock()  # 線程鎖
         self.stream = None  # 放 InputStream
+        self.frames_written = 0  # total samples received since start (absolute clock)
 
         # 🚀 立刻啟動 stream！
         self._start_stream()
@@ -56,9 +57,14 @@ class MicReader:
         """
         Stream callback: 每次有新資料到時會被呼叫。
         """
-        data = indata[:, 0]  # 取得單聲道資料
+        data = indata[-self.maxlen_frames :, 0]  # 取得單聲道資料
         with self.lock:
-            self.buffer.extend(data)  # 新資料推進 buffer
+            # 新資料寫進 ring buffer (split in two when it wraps around the end)
+            pos = (self.frames_written + frames - len(data)) % self.maxlen_frames
+            first = min(len(data), self.maxlen_frames - pos)
+            self._ring[pos : pos + first] = data[:first]
+            self._ring[: len(data) - first] = data[first:]
+            self.frames_written += frames
 
     def stop(self):
         """
@@ -69,12 +75,47 @@ class MicReader:
             self.stream.close()
             self.stream = None
 
+    def _tail(self, num_frames: int, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Copy of the newest `num_frames` buffered samples, oldest first, made into
+        the start of `out` if given (a view of it is returned). Hold the lock.
+        """
+        n = min(num_frames, self.frames_written, self.maxlen_frames)
+        end = self.frames_written % self.maxlen_frames
+        if out is None:
+            if n <= end:
+                return self._ring[end - n : end].copy()
+            return np.concatenate((self._ring[end - n :], self._ring[:end]))
+
+        out = out[:n]
+        if n <= end:
+            out[:] = self._ring[end - n : end]
+        else:
+            out[: n - end] = self._ring[end - n :]
+            out[n - end :] = self._ring[:end]
+        return out
+
     def get_buffer(self) -> np.ndarray:
         """
         Return the current buffer as a numpy array.
         """
         with self.lock:
-            return np.array(self.buffer)
+            return self._tail(self.maxlen_frames)
+
+    def get_latest(
+        self, num_frames: int, out: np.ndarray | None = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Return the newest `num_frames` samples together with `frames_written`,
+        i.e. the absolute index one past the last returned sample.
+
+        Only the requested samples are copied out of the ring buffer. With `out`
+        (a float32 array of at least `num_frames` samples) they are copied into
+        the caller's buffer and a view of it is returned, so polling a fixed
+        window allocates nothing.
+        """
+        with self.lock:
+            return self._tail(num_frames, out), self.frames_written
 
     def __call__(self, *args, **kwargs) -> Tuple[np.ndarray, int]:
         """
@@ -85,11 +126,7 @@ class MicReader:
         num_frames = int(win_sec * self.sr)
 
         with self.lock:
-            if len(self.buffer) < num_frames:
-                # 資料太少，回傳目前 buffer
-                y = np.array(self.buffer)
-            else:
-                # 回傳最後 win_sec 秒
-                y = np.array(self.buffer)[-num_frames:]
+            # 回傳最後 win_sec 秒 (資料太少時回傳目前 buffer)
+            y = self._tail(num_frames)
 
         return y, self.sr
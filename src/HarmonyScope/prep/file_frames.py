@@ -1,46 +1,107 @@
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, Dict, Any
 import librosa, numpy as np
-from tqdm import tqdm
+import scipy.fft, scipy.signal
 from HarmonyScope.analyzer.chord_analyzer import ChordAnalyzer
 
 Frame = Dict[str, Any]
+FrameGetter = Callable[[int], Frame]
 
 
-def prepare_frames(path: Path, ana: ChordAnalyzer) -> tuple[List[Frame], float, float]:
-    y, sr = librosa.load(path, sr=None, mono=True)
+def prepare_frames(
+    path: Path, ana: ChordAnalyzer
+) -> tuple[FrameGetter, int, float, float]:
+    """
+    Analyze `path` and return ``(get_frame, n_frames, hop_sec, win_sec)``.
+
+    Per-frame results are stored column-wise (a list of chord names and one
+    ``(n_frames, 12)`` array of per-pitch-class detection counts); the
+    waveform, spectrogram and chroma of frame ``idx`` are cut from whole-file
+    arrays when `get_frame(idx)` is first called, and the most recently viewed
+    frames are cached.
+    """
+    # Decode once and share the samples with the analyzer
+    y, sr = ana.reader(path)
     hop_sec, win_sec = ana.hop_sec, ana.win_sec
     hop_len, win_len = int(hop_sec * sr), int(win_sec * sr)
 
-    results = ana.stream_file_live(str(path))
-    frames: List[Frame] = []
-    for idx, res in enumerate(tqdm(results, desc="Analyzing")):
+    # Overlapping windows share most of their samples, so transform the whole
+    # file once and slice the per-window columns out of it below.
+    mag_full, colmax_full = _stft_mag(y)
+    chroma_full = _chroma(librosa.feature.chroma_stft(y=y, sr=sr, hop_length=_STFT_HOP))
+    cols_per_win = 1 + win_len // _STFT_HOP
+    # The waveform is only drawn, so plain decimation to ~2 kHz is enough
+    wave_step = max(1, sr // 2_000)
+
+    results = ana.stream_array_live(y, sr)
+    chords = [res[0] or "None" for res in results]
+    pc_counts = np.array(
+        [res[2].detection_count for res in results], dtype=np.int32
+    ).reshape(-1, 12)
+
+    @lru_cache(maxsize=64)
+    def get_frame(idx: int) -> Frame:
         seg = y[idx * hop_len : idx * hop_len + win_len]
-        frames.append(
-            dict(
-                t=idx * hop_sec,
-                wave=librosa.resample(seg, orig_sr=sr, target_sr=2_000).astype("f4"),
-                spec=_spec(seg, sr),
-                chroma=_chroma(seg, sr),
-                chord=res[0] or "None",
-                pc_summary=res[2],
-            )
+        col = round(idx * hop_len / _STFT_HOP)
+        cols = slice(col, col + cols_per_win)
+        return dict(
+            t=idx * hop_sec,
+            wave=seg[::wave_step],
+            spec=_spec(mag_full[:, cols], colmax_full[cols].max(initial=0.0)),
+            chroma=chroma_full[:, cols],
+            chord=chords[idx],
+            pc_counts=pc_counts[idx],
         )
-    return frames, hop_sec, win_sec
+
+    return get_frame, len(results), hop_sec, win_sec
 
 
 # -- private helpers ---------------------------------
-import numpy as np
+_STFT_HOP = 128
+_N_FFT = 512
+_SPEC_BINS = 128  # lowest half of the 257 bins (0 – sr/4)
+_HANN = scipy.signal.get_window("hann", _N_FFT).astype(np.float32)
+
+
+def _stft_mag(y: np.ndarray, block: int = 4096) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Magnitude of the lowest `_SPEC_BINS` STFT bins, matching
+    ``np.abs(librosa.stft(y, n_fft=512, hop_length=128))[:128]``, and the
+    maximum magnitude of each column over the whole spectrum (all 257 bins).
+
+    The zero-padded signal is framed as a strided view and transformed
+    `block` frames at a time with the cached Hann window, so only the bins
+    that are displayed are kept. The windowed frames of every block go into
+    one preallocated buffer.
+    """
+    padded = np.pad(y.astype(np.float32, copy=False), _N_FFT // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, _N_FFT)[::_STFT_HOP]
+    mag = np.empty((_SPEC_BINS, len(frames)), dtype=np.float32)
+    colmax = np.empty(len(frames), dtype=np.float32)
+    windowed = np.empty((min(block, len(frames)), _N_FFT), dtype=np.float32)
+    for i in range(0, len(frames), block):
+        n = min(block, len(frames) - i)
+        np.multiply(frames[i : i + n], _HANN, out=windowed[:n])
+        spec = np.abs(scipy.fft.rfft(windowed[:n], axis=-1, overwrite_x=True))
+        mag[:, i : i + n] = spec[:, :_SPEC_BINS].T
+        spec.max(axis=-1, out=colmax[i : i + n])
+    return mag, colmax
 
 
-def _spec(seg: np.ndarray, sr: int):
-    S = librosa.amplitude_to_db(
-        np.abs(librosa.stft(seg, n_fft=512, hop_length=128)), ref=np.max
-    )[:128]
-    return ((np.nan_to_num(S, neginf=-80) + 80) / 80).clip(0, 1).astype("f4")
+# Both helpers work in float32 (librosa keeps the dtype of the float32 input)
+# and normalise in place on arrays they own, so no float64 temporaries are made.
+def _spec(mag: np.ndarray, ref: float):
+    # dB relative to the window's loudest bin over the whole spectrum (`ref`), not
+    # just the displayed bins; the clip to [0, 1] below is the 80 dB top_db floor
+    S = librosa.amplitude_to_db(mag, ref=ref, top_db=None)
+    np.nan_to_num(S, copy=False, neginf=-80.0)
+    S += 80
+    S *= 1 / 80
+    return np.clip(S, 0, 1, out=S)
 
 
-def _chroma(seg: np.ndarray, sr: int):
-    C = librosa.feature.chroma_stft(y=seg, sr=sr, hop_length=128)
-    return np.nan_to_num(C).clip(0, 1).astype("f4")
+def _chroma(C: np.ndarray):
+    np.nan_to_num(C, copy=False)
+    return np.clip(C, 0, 1, out=C)
@@ -1,21 +1,23 @@
+from HarmonyScope.core.constants import PITCH_CLASS_NAMES
 from HarmonyScope.ui.plot import plot_chroma, plot_spec, plot_wave
 import gradio as gr, pandas as pd
-from typing import List, Dict, Any
+from typing import Callable, Dict, Any
 
 Frame = Dict[str, Any]
 
 
-def build_gradio_app(frames: List[Frame], hop: float, win: float) -> gr.Blocks:
+def build_gradio_app(
+    get_frame: Callable[[int], Frame], n_frames: int, hop: float, win: float
+) -> gr.Blocks:
     """Minimal-whitespace responsive layout using only props compatible with older Gradio versions."""
 
     def render(idx: int):
-        f = frames[idx]
+        f = get_frame(int(idx))
         w_fig = plot_wave(f["wave"], f["t"], win)
         s_fig = plot_spec(f["spec"], f["t"], win)
         c_fig = plot_chroma(f["chroma"], f["t"], win)
         t_range = f"{f['t']:.2f} – {(f['t']+win):.2f} s"
-        df = pd.DataFrame(f["pc_summary"])[["name", "detection_count"]]
-        df.columns = ["PC", "Frames"]
+        df = pd.DataFrame({"PC": PITCH_CLASS_NAMES, "Frames": f["pc_counts"]})
         return w_fig, s_fig, c_fig, f["chord"], t_range, df
 
     # Styles: shrink container + limit table height via CSS so we can drop max_rows param
@@ -32,7 +34,7 @@ def build_gradio_app(frames: List[Frame], hop: float, win: float) -> gr.Blocks:
             with gr.Column(scale=1, min_width=260):
                 slider = gr.Slider(
                     0,
-                    len(frames) - 1,
+                    n_frames - 1,
                     step=1,
                     value=0,
                     label=f"Frame (hop = {hop:.2f}s)",
@@ -1,23 +1,34 @@
 import matplotlib.pyplot as plt, numpy as np
+from typing import Any, Dict
 from HarmonyScope.core.constants import PITCH_CLASS_NAMES
 
+# Figures are built once and then updated in place on every call: building a
+# figure (and its colorbar / tight_layout) costs far more than swapping the data.
+# Gradio serialises each returned figure before the next event on the same
+# listener runs, so sharing them across calls is safe.
+_FIGURES: Dict[str, Dict[str, Any]] = {}
+
 
 def plot_wave(wave: np.ndarray, start: float, win: float) -> plt.Figure:
-    fig, ax = plt.subplots(figsize=(7.5, 2.7))
+    cached = _FIGURES.get("wave")
+    if cached is None:
+        fig, ax = plt.subplots(figsize=(7.5, 2.7))
+        (line,) = ax.plot([], [], linewidth=0.6, color="#1e90ff")
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Amplitude")
+        ax.set_ylim(-1.05, 1.05)
+        fig.tight_layout()
+        cached = _FIGURES["wave"] = dict(fig=fig, ax=ax, line=line)
+
     t = np.linspace(start, start + win, len(wave))
-    ax.plot(t, wave, linewidth=0.6, color="#1e90ff")
-    ax.set_xlabel("Time (s)")
-    ax.set_ylabel("Amplitude")
-    ax.set_ylim(-1.05, 1.05)
-    fig.tight_layout()
-    return fig
+    cached["line"].set_data(t, wave)
+    cached["ax"].set_xlim(start, start + win)
+    return cached["fig"]
 
 
 def plot_spec(
     spec: np.ndarray, start: float, win: float, sr: int = 22050
 ) -> plt.Figure:
-    fig, ax = plt.subplots(figsize=(7.5, 3.6))
-
     n_bins = spec.shape[0]
     max_freq_khz = sr / 2 / 1000
     freqs = np.linspace(0, max_freq_khz, n_bins)
@@ -33,38 +44,58 @@ def plot_spec(
     else:
         min_freq, max_freq = 0, max_freq_khz  # fallback
 
-    im = ax.imshow(
-        spec,
-        origin="lower",
-        aspect="auto",
-        cmap="magma",
-        extent=[start, start + win, 0, max_freq_khz],
-        vmin=0,
-        vmax=1,
-    )
-    ax.set_ylim(min_freq, max_freq)
-    ax.set_ylabel("Frequency (kHz)")
-    ax.set_xlabel("Time (s)")
-    fig.colorbar(im, ax=ax, fraction=0.046).set_label("Norm dB")
-    fig.tight_layout()
-    return fig
+    extent = [start, start + win, 0, max_freq_khz]
+    cached = _FIGURES.get("spec")
+    if cached is None:
+        fig, ax = plt.subplots(figsize=(7.5, 3.6))
+        im = ax.imshow(
+            spec,
+            origin="lower",
+            aspect="auto",
+            cmap="magma",
+            extent=extent,
+            vmin=0,
+            vmax=1,
+        )
+        ax.set_ylabel("Frequency (kHz)")
+        ax.set_xlabel("Time (s)")
+        fig.colorbar(im, ax=ax, fraction=0.046).set_label("Norm dB")
+        fig.tight_layout()
+        cached = _FIGURES["spec"] = dict(fig=fig, ax=ax, im=im)
+    else:
+        cached["im"].set_data(spec)
+        cached["im"].set_extent(extent)
+
+    cached["ax"].set_xlim(start, start + win)
+    cached["ax"].set_ylim(min_freq, max_freq)
+    return cached["fig"]
 
 
 def plot_chroma(chroma: np.ndarray, start: float, win: float) -> plt.Figure:
-    fig, ax = plt.subplots(figsize=(7.5, 3.0))
-    im = ax.imshow(
-        chroma,
-        origin="lower",
-        aspect="auto",
-        cmap="magma",
-        extent=[start, start + win, 0, 12],
-        vmin=0,
-        vmax=1,
-    )
-    ax.set_yticks(np.arange(0.5, 12.5, 1))
-    ax.set_yticklabels(PITCH_CLASS_NAMES)
-    ax.set_xlabel("Time (s)")
-    ax.set_ylabel("Pitch class")
-    fig.colorbar(im, ax=ax, fraction=0.046).set_label("Energy")
-    fig.tight_layout()
-    return fig
+    extent = [start, start + win, 0, 12]
+    cached = _FIGURES.get("chroma")
+    if cached is None:
+        fig, ax = plt.subplots(figsize=(7.5, 3.0))
+        im = ax.imshow(
+            chroma,
+            origin="lower",
+            aspect="auto",
+            cmap="magma",
+            extent=extent,
+            vmin=0,
+            vmax=1,
+        )
+        ax.set_yticks(np.arange(0.5, 12.5, 1))
+        ax.set_yticklabels(PITCH_CLASS_NAMES)
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Pitch class")
+        fig.colorbar(im, ax=ax, fraction=0.046).set_label("Energy")
+        fig.tight_layout()
+        cached = _FIGURES["chroma"] = dict(fig=fig, ax=ax, im=im)
+    else:
+        cached["im"].set_data(chroma)
+        cached["im"].set_extent(extent)
+
+    cached["ax"].set_xlim(start, start + win)
+    cached["ax"].set_ylim(0, 12)
+    return cached["fig"]
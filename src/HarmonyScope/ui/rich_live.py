@@ -2,8 +2,17 @@ from rich.live import Live
 from rich.text import Text
 from rich.panel import Panel
 from rich.console import Group, Console
-from HarmonyScope.core.constants import PITCH_CLASS_NAMES
-from HarmonyScope.ui.table import make_pitch_class_table, make_detected_notes_table
+from HarmonyScope.ui.table import (
+    PC_DISPLAY_NAMES,
+    make_pitch_class_table,
+    make_detected_notes_table,
+)
+
+# Comma-joined pitch-class names for every 12-bit active mask, in ascending order
+_ACTIVE_NAMES = tuple(
+    ", ".join(name for pc, name in enumerate(PC_DISPLAY_NAMES) if mask >> pc & 1)
+    for mask in range(1 << 12)
+)
 
 
 class LiveMicUI:
@@ -16,7 +25,7 @@ class LiveMicUI:
         self,
         chord,
         active_pcs,
-        pitch_data_by_pc,
+        pc_stats,
         detailed_peaks,
         segment_rms_db,
         total_voiced_frames,
@@ -31,15 +40,17 @@ class LiveMicUI:
                 f"Voiced Frames: {total_voiced_frames}"
             )
         )
-        renderables.append(make_pitch_class_table(pitch_data_by_pc))
+        renderables.append(make_pitch_class_table(pc_stats))
 
-        active_names = (
-            ", ".join(PITCH_CLASS_NAMES[p] for p in sorted(active_pcs))
-            or "[dim]None[/dim]"
-        )
+        active_names = _ACTIVE_NAMES[active_pcs] or "[dim]None[/dim]"
         renderables.append(Panel(active_names, title="Active PC Summary", expand=False))
 
-        chord_text = f"[bold green]{chord}[/bold green]" if chord else "[dim]None[/dim]"
+        # Sharps drawn as in PC_DISPLAY_NAMES (C♯m rather than C#m)
+        chord_text = (
+            f"[bold green]{chord.replace('#', '♯')}[/bold green]"
+            if chord
+            else "[dim]None[/dim]"
+        )
         renderables.append(Panel(chord_text, title="Chord Result", expand=False))
 
         return Group(*renderables)
@@ -52,7 +63,7 @@ def live_mic_loop(analyzer, ui: LiveMicUI, interval_sec: float):
             (
                 chord,
                 active_pcs,
-                pitch_data_by_pc,
+                pc_stats,
                 detailed_peaks,
                 seg_rms_db,
                 voiced_frames,
@@ -61,7 +72,7 @@ def live_mic_loop(analyzer, ui: LiveMicUI, interval_sec: float):
                 ui.build_renderable(
                     chord,
                     active_pcs,
-                    pitch_data_by_pc,
+                    pc_stats,
                     detailed_peaks,
                     seg_rms_db,
                     voiced_frames,
@@ -1,107 +1,132 @@
 from rich.table import Table
 import numpy as np
 from HarmonyScope.core.constants import PITCH_CLASS_NAMES
+from HarmonyScope.core.pitch import PCStats
 from typing import List, Dict, Any
 
-__all__ = ["make_pitch_class_table", "make_detected_notes_table"]
-
-
-def make_pitch_class_table(pitch_data_by_pc: List[Dict]) -> Table:
+__all__ = ["PC_DISPLAY_NAMES", "make_pitch_class_table", "make_detected_notes_table"]
+
+
+# Columns of the fixed pitch class table
+_PC_TABLE_COLUMNS = [
+    {"header": "PC", "justify": "center"},  # Pitch Class (C, C♯, etc.)
+    {
+        "header": "Frames W/PC",
+        "justify": "center",
+    },  # Count of frames this PC was detected in across ANY octave
+    {
+        "header": "Min Req Frames",
+        "justify": "center",
+    },  # Minimum frames required for PC to be active
+    {
+        "header": "Total Voiced Frames",
+        "justify": "center",
+    },  # Total voiced frames in window
+    {
+        "header": "Total Peaks Found",
+        "justify": "center",
+    },  # Total individual peaks detected for this PC across ALL octaves
+    {
+        "header": "Avg Prom (dB)",
+        "justify": "center",
+    },  # Average prominence across detected peaks FOR THIS PC
+    {
+        "header": "Avg Level (dB)",
+        "justify": "center",
+    },  # Average peak level across detected peaks FOR THIS PC
+    {
+        "header": "Avg Diff (dB)",
+        "justify": "center",
+    },  # Average level diff across detected peaks FOR THIS PC
+    {
+        "header": "Active",
+        "justify": "center",
+    },  # Whether this PC is considered "active" based on frame count
+]
+
+_MISSING = "--"
+
+# Pitch class names as displayed, with a proper sharp sign (C♯ rather than C#)
+PC_DISPLAY_NAMES = tuple(name.replace("#", "♯") for name in PITCH_CLASS_NAMES)
+
+
+def _pitch_class_table_skeleton() -> Table:
     """
-    Creates a fixed-row rich Table (1 row per pitch class) displaying aggregated info.
-
-    pitch_data_by_pc: a list of 12 dicts, one for each pitch class (0-11), with aggregated info.
-      Each dict includes: {'pc', 'name', 'detection_count', 'total_contributions',
-                           'min_required_frames', 'total_voiced_frames', 'active',
-                           'avg_prominence_db', 'avg_peak_level_db', 'avg_level_diff_db'}
+    The pitch class table with its 12 rows (one per pitch class) named and
+    otherwise left blank.
     """
-    # Define columns for the fixed pitch class table
-    columns = [
-        {"header": "PC", "justify": "center"},  # Pitch Class (C, C#, etc.)
-        {
-            "header": "Frames W/PC",
-            "justify": "center",
-        },  # Count of frames this PC was detected in across ANY octave
-        {
-            "header": "Min Req Frames",
-            "justify": "center",
-        },  # Minimum frames required for PC to be active
-        {
-            "header": "Total Voiced Frames",
-            "justify": "center",
-        },  # Total voiced frames in window
-        {
-            "header": "Total Peaks Found",
-            "justify": "center",
-        },  # Total individual peaks detected for this PC across ALL octaves
-        {
-            "header": "Avg Prom (dB)",
-            "justify": "center",
-        },  # Average prominence across detected peaks FOR THIS PC
-        {
-            "header": "Avg Level (dB)",
-            "justify": "center",
-        },  # Average peak level across detected peaks FOR THIS PC
-        {
-            "header": "Avg Diff (dB)",
-            "justify": "center",
-        },  # Average level diff across detected peaks FOR THIS PC
-        {
-            "header": "Active",
-            "justify": "center",
-        },  # Whether this PC is considered "active" based on frame count
-    ]
-
     table = Table(
         title="Pitch Class Activity (Aggregated across Octaves)", expand=False
     )
-
-    # Add columns
-    for col in columns:
+    for col in _PC_TABLE_COLUMNS:
         table.add_column(**col)
+    for name in PC_DISPLAY_NAMES:
+        table.add_row(name, *[""] * (len(_PC_TABLE_COLUMNS) - 1))
+    return table
 
-    # The pitch_data_by_pc list should always have 12 entries, one for each PC, sorted 0-11
-    for pc_info in pitch_data_by_pc:
-        name = pc_info.get("name", "N/A")
-        frame_count = pc_info.get("detection_count", 0)  # Frame count
-        total_peaks_found = pc_info.get(
-            "total_contributions", 0
-        )  # Total peak detections for this PC
-        required_frames = pc_info.get("min_required_frames", 0)
-        total_voiced = pc_info.get("total_voiced_frames", 0)
-        active = "✔" if pc_info.get("active", False) else ""
-
-        # Metrics are averages across individual peak detections for this PC
-        prominence_avg = pc_info.get("avg_prominence_db", -np.inf)
-        peak_level_avg = pc_info.get("avg_peak_level_db", -np.inf)
-        level_diff_avg = pc_info.get("avg_level_diff_db", np.inf)
-
-        # Handle -inf and +inf for display when no detections occurred for this PC
-        prominence_display = (
-            f"{prominence_avg:.1f}" if np.isfinite(prominence_avg) else "--"
-        )
-        peak_level_display = (
-            f"{peak_level_avg:.1f}" if np.isfinite(peak_level_avg) else "--"
+
+# Built once; make_pitch_class_table only rewrites the cells after the names
+_PC_TABLE = _pitch_class_table_skeleton()
+
+
+def make_pitch_class_table(pc_stats: PCStats) -> Table:
+    """
+    Fills the fixed-row rich Table (1 row per pitch class) with aggregated info.
+
+    The same Table object is returned on every call with its cells overwritten,
+    so render it before the next call.
+
+    pc_stats: the `PCStats` of a window, arrays of 12 entries indexed by pitch
+      class (0-11) plus the window's 'min_required_frames' and 'total_voiced_frames'.
+    """
+    # Metrics are averages across individual peak detections for each PC; they are
+    # -inf/+inf when no detections occurred. Each metric's 12 display strings come
+    # from one pass over its values and finiteness flags, like
+    # np.where(np.isfinite(v), np.char.mod("%.1f", v), "--") but formatting only
+    # the finite values (np.char.mod formats element by element in Python anyway)
+    averages = np.array(
+        (
+            pc_stats.avg_prominence_db,
+            pc_stats.avg_peak_level_db,
+            pc_stats.avg_level_diff_db,
         )
+    )
+    prominence_displays, peak_level_displays, level_diff_displays = (
+        [f"{value:.1f}" if ok else _MISSING for value, ok in zip(values, finite)]
+        for values, finite in zip(averages.tolist(), np.isfinite(averages).tolist())
+    )
+
+    # The columns as plain Python values; the window totals are the same in every row
+    frame_counts = pc_stats.detection_count.tolist()
+    total_peaks = pc_stats.total_contributions.tolist()
+    active_flags = pc_stats.active.tolist()
+    required_frames = str(pc_stats.min_required_frames)
+    total_voiced = str(pc_stats.total_voiced_frames)
+
+    # Row i is pitch class i (the row names are fixed in _PC_TABLE)
+    for row in range(len(PC_DISPLAY_NAMES)):
+        total_peaks_found = total_peaks[row]  # Total peak detections for this PC
+        active = "✔" if active_flags[row] else ""
+
+        # The level diff is only shown for PCs with peaks
         level_diff_display = (
-            (f"{level_diff_avg:.1f}" if np.isfinite(level_diff_avg) else "--")
-            if total_peaks_found > 0
-            else "--"
+            level_diff_displays[row] if total_peaks_found > 0 else _MISSING
         )
 
-        table.add_row(
-            name,
-            str(frame_count),
-            str(required_frames),
-            str(total_voiced),
+        cells = (
+            str(frame_counts[row]),
+            required_frames,
+            total_voiced,
             str(total_peaks_found),  # Display total peaks
-            prominence_display,
-            peak_level_display,
+            prominence_displays[row],
+            peak_level_displays[row],
             level_diff_display,
             active,
         )
+        for column, cell in zip(_PC_TABLE.columns[1:], cells):
+            column._cells[row] = cell
 
-    return table
+    return _PC_TABLE
 
 
 def make_detected_notes_table(detected_notes_data: List[Dict[str, Any]]) -> Table:
@@ -145,7 +170,7 @@ def make_detected_notes_table(detected_notes_data: List[Dict[str, Any]]) -> Tabl
 
     for note_info in sorted_notes:
         # Format note name (e.g., C4, G#5)
-        pc_name = PITCH_CLASS_NAMES[note_info.get("pc", 0)]
+        pc_name = PC_DISPLAY_NAMES[note_info.get("pc", 0)]
         octave = note_info.get("octave", -1)
         note_display = (
             f"{pc_name}{octave}" if octave >= 0 else pc_name
@@ -0,0 +1,27 @@
+from src.HarmonyScope.core.chord import identify_chord
+
+
+def _mask(*pcs):
+    return sum(1 << pc for pc in pcs)
+
+
+def _peaks(*midi_notes):
+    return [{"midi_note": m, "pc": m % 12} for m in midi_notes]
+
+
+def test_identify_basic_triads():
+    assert identify_chord(_mask(0, 4, 7), _peaks(48, 52, 55)) == "C"
+    assert identify_chord(_mask(9, 0, 4), _peaks(57, 60, 64)) == "Am"
+    assert identify_chord(_mask(11, 2, 5), _peaks(59, 62, 65)) == "Bdim"
+
+
+def test_identify_seventh_chord():
+    assert identify_chord(_mask(7, 11, 2, 5), _peaks(43, 47, 50, 53)) == "G7"
+
+
+def test_identify_slash_chord_from_bass():
+    assert identify_chord(_mask(0, 4, 7), _peaks(40, 48, 55)) == "C/E"
+
+
+def test_identify_no_active_pitch_classes():
+    assert identify_chord(0, _peaks(48)) is None
@@ -0,0 +1,119 @@
+import numpy as np
+from scipy.io.wavfile import write
+from src.HarmonyScope import generate
+from src.HarmonyScope.analyzer import chord_analyzer
+from src.HarmonyScope.analyzer.chord_analyzer import ChordAnalyzer
+from src.HarmonyScope.core.pitch import pitch_frames
+from src.HarmonyScope.io.file_reader import FileReader
+
+PROGRESSION = ("C", "Am", "F")  # generate.DURATION seconds each
+
+
+def _write_progression(tmp_path):
+    path = tmp_path / "progression.wav"
+    y = np.concatenate([generate.generate_chord_wave(name) for name in PROGRESSION])
+    write(path, generate.SAMPLE_RATE, y)
+    return path
+
+
+class _FakeStream:
+    """Live reader over a fixed signal that advances by `step` samples per read."""
+
+    def __init__(self, y, sr, start, step):
+        self.y, self.sr, self.step = y, sr, step
+        self.frames_written = start
+        self.ends = []
+
+    def get_buffer(self):
+        return self.y[: self.frames_written].copy()
+
+    def get_latest(self, num_frames, out=None):
+        end = self.frames_written
+        self.ends.append(end)
+        self.frames_written = min(end + self.step, len(self.y))
+        seg = self.y[end - num_frames : end]
+        if out is None:
+            return seg.copy(), end
+        out = out[:num_frames]
+        out[:] = seg
+        return out, end
+
+    def stop(self):
+        pass
+
+
+def test_stream_mic_live_matches_segment_analysis(monkeypatch):
+    monkeypatch.setattr(chord_analyzer.time, "sleep", lambda _: None)
+    sr = generate.SAMPLE_RATE
+    y = (
+        np.concatenate(
+            [generate.generate_chord_wave(name)[:sr] for name in PROGRESSION]
+        ).astype(np.float32)
+        / 32767
+    )
+    win = int(0.75 * sr)
+    reader = _FakeStream(y, sr, start=win, step=int(0.05 * sr))
+    ana = ChordAnalyzer(reader, win_sec=0.75)
+
+    stream = ana.stream_mic_live(interval_sec=0)
+    results = [next(stream) for _ in range((len(y) - win) // reader.step)]
+    stream.close()
+
+    for end, result in zip(reader.ends, results):
+        expected = ana._analyze_segment(y[end - win : end], sr)
+        assert result[0] == expected[0]  # chord
+        assert result[1] == expected[1]  # active pitch classes
+        assert result[3] == expected[3]  # peaks
+        assert result[5] == expected[5]  # voiced frames
+
+
+def test_timeline_follows_chord_progression(tmp_path):
+    ana = ChordAnalyzer(FileReader(), win_sec=1.0, hop_sec=0.5)
+    timeline = list(ana.timeline(_write_progression(tmp_path)))
+
+    assert [(start, end) for start, end, _ in timeline] == [
+        (i * 0.5, i * 0.5 + 1.0) for i in range(11)
+    ]
+    # Windows at least half a second away from a chord change
+    chords = {start: chord for start, _, chord in timeline}
+    assert chords[0.0] == chords[0.5] == "C"
+    assert chords[2.5] == "Am"
+    assert chords[4.5] == chords[5.0] == "F"
+
+
+def test_sliding_windows_match_segment_analysis(tmp_path):
+    ana = ChordAnalyzer(FileReader(), win_sec=1.0, hop_sec=0.5)
+    y, sr = ana.reader(_write_progression(tmp_path))
+    win, hop = int(ana.win_sec * sr), int(ana.hop_sec * sr)
+
+    windows = list(ana._sliding_windows(y, sr))
+    assert len(windows) == 1 + (len(y) - win) // hop
+    for start, seg, voiced_frames, frame_peaks in windows:
+        np.testing.assert_array_equal(seg, y[start : start + win])
+        # Same frames per window as the whole-window CQT of _analyze_segment
+        assert len(voiced_frames) == len(frame_peaks)
+        assert len(voiced_frames) == len(pitch_frames(seg, sr)[0])
+
+        result = ana._analyze_frames(seg, voiced_frames, frame_peaks)
+        expected = ana._analyze_segment(seg, sr)
+        assert result[1] == expected[1]  # active pitch classes
+        assert result[5] == expected[5]  # voiced frames
+        if start / sr in (0.0, 0.5, 2.5, 4.5, 5.0):  # away from chord changes
+            assert result[0] == expected[0]
+
+
+def test_analyze_files_matches_analyze_file(tmp_path):
+    sr = generate.SAMPLE_RATE
+    # At batch_size=2 the three 2 s files make a two-row and a one-row batch,
+    # the two 1 s files one two-row batch, and the 1.5 s file a batch of its own
+    clips = [("C", 2), ("Am", 1), ("F", 2), ("G", 1.5), ("Dm", 1), ("E", 2)]
+    paths = []
+    for i, (name, seconds) in enumerate(clips):
+        path = tmp_path / f"{i}_{name}.wav"
+        write(path, sr, generate.generate_chord_wave(name)[: int(seconds * sr)])
+        paths.append(path)
+
+    ana = ChordAnalyzer(FileReader())
+    chords = ana.analyze_files(paths, batch_size=2)
+    assert chords == [ana.analyze_file(path) for path in paths]
+    assert chords == [name for name, _ in clips]
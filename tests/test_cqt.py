@@ -0,0 +1,19 @@
+import librosa
+import numpy as np
+import pytest
+from src.HarmonyScope.core.cqt import cqt_magnitude
+
+
+@pytest.mark.parametrize("sr", [22050, 44100])
+def test_cqt_magnitude_matches_librosa(sr):
+    rng = np.random.default_rng(0)
+    y = (0.1 * rng.standard_normal((2, sr))).astype(np.float32)
+    kw = dict(
+        hop_length=512, fmin=librosa.midi_to_hz(36), n_bins=168, bins_per_octave=24
+    )
+    expected = np.abs(librosa.cqt(y, sr=sr, **kw))
+    actual = cqt_magnitude(y, sr, **kw)
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-5 * expected.max())
+    np.testing.assert_allclose(cqt_magnitude(y[0], sr, **kw), expected[0], atol=1e-6)
@@ -0,0 +1,23 @@
+import librosa
+import numpy as np
+import pytest
+from src.HarmonyScope.prep import file_frames
+
+
+@pytest.mark.parametrize("block", [4096, 7])
+def test_stft_mag_matches_librosa(block):
+    rng = np.random.default_rng(0)
+    sr = 22050
+    t = np.arange(sr + 77) / sr  # not a whole number of hops
+    # A 440 Hz tone in the kept bins, and a louder 8 kHz one above them
+    y = np.sin(2 * np.pi * 440 * t) + 2 * np.sin(2 * np.pi * 8000 * t)
+    y = (0.2 * y + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+    mag, colmax = file_frames._stft_mag(y, block=block)
+
+    expected = np.abs(librosa.stft(y, n_fft=512, hop_length=128))
+    assert mag.shape == (128, expected.shape[1])
+    np.testing.assert_allclose(mag, expected[:128], rtol=1e-4, atol=1e-4)
+    # The column maximum covers all 257 bins, not just the 128 that are kept
+    assert np.all(colmax[2:-2] > 1.5 * mag[:, 2:-2].max(axis=0))
+    np.testing.assert_allclose(colmax, expected.max(axis=0), rtol=1e-4, atol=1e-4)
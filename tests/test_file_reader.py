@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import pytest
+from scipy.io.wavfile import write
+from src.HarmonyScope import generate
+from src.HarmonyScope.io.file_reader import FileReader
+
+
+def test_cached_decode_is_shared_and_read_only(tmp_path):
+    path = tmp_path / "C.wav"
+    write(path, generate.SAMPLE_RATE, generate.generate_chord_wave("C"))
+    reader = FileReader()
+
+    y, sr = reader(path)
+    y_again, _ = reader(str(path))
+    assert sr == 22050
+    assert y_again is y
+    assert not y.flags.writeable
+    with pytest.raises(ValueError):
+        y[0] = 0.0
+
+
+def test_rewritten_file_is_decoded_again(tmp_path):
+    path = tmp_path / "chord.wav"
+    write(path, generate.SAMPLE_RATE, generate.generate_chord_wave("C"))
+    reader = FileReader()
+    y_c, _ = reader(path)
+
+    write(path, generate.SAMPLE_RATE, generate.generate_chord_wave("Am"))
+    # Make sure the mtime moves even on filesystems with a coarse clock
+    mtime_ns = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    y_am, _ = reader(path)
+
+    assert y_am is not y_c
+    assert not np.array_equal(y_am, y_c)
+    np.testing.assert_array_equal(y_am, reader(path)[0])
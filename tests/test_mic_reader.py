@@ -0,0 +1,59 @@
+import sys
+import types
+import numpy as np
+import pytest
+
+
+class _FakeInputStream:
+    """Stands in for sounddevice.InputStream; the test calls the callback itself."""
+
+    def __init__(self, callback, **kwargs):
+        self.callback = callback
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def mic_reader(monkeypatch):
+    fake_sd = types.ModuleType("sounddevice")
+    fake_sd.InputStream = _FakeInputStream
+    monkeypatch.setitem(sys.modules, "sounddevice", fake_sd)
+    from src.HarmonyScope.io import mic_reader
+
+    monkeypatch.setattr(mic_reader, "sd", fake_sd)
+    return mic_reader
+
+
+def test_ring_buffer_wraps_around(mic_reader):
+    reader = mic_reader.MicReader(sr=100, maxlen_sec=0.37)  # 37-sample ring
+    rng = np.random.default_rng(0)
+    received = np.zeros(0, dtype=np.float32)
+    out = np.empty(50, dtype=np.float32)
+
+    # Blocks shorter and longer than the ring, so writes wrap and overwrite it
+    for size in rng.integers(1, 60, size=200).tolist():
+        block = rng.standard_normal((size, 1)).astype(np.float32)
+        reader._callback(block, size, None, None)
+        received = np.concatenate((received, block[:, 0]))
+
+        assert reader.frames_written == len(received)
+        np.testing.assert_array_equal(reader.get_buffer(), received[-37:])
+        for n in (1, 10, 37, 50):
+            expected = received[-min(n, 37) :]
+            seg, end = reader.get_latest(n)
+            np.testing.assert_array_equal(seg, expected)
+            assert end == len(received)
+            seg, _ = reader.get_latest(n, out=out)
+            np.testing.assert_array_equal(seg, expected)
+            assert np.shares_memory(seg, out)
+
+    y, sr = reader(win_sec=0.2)
+    np.testing.assert_array_equal(y, received[-20:])
+    assert sr == 100
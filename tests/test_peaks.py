@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import scipy.signal
+from src.HarmonyScope.core.peaks import pick_peaks
+
+
+def _scipy_peaks(C, percentile, distance):
+    frames, bins, prominences = [], [], []
+    for frame in range(C.shape[1]):
+        column = C[:, frame]
+        positive = column[column > 1e-12]
+        height = np.percentile(positive, percentile) if len(positive) else 0
+        peaks, _ = scipy.signal.find_peaks(column, height=height, distance=distance)
+        frames += [frame] * len(peaks)
+        bins += peaks.tolist()
+        prominences += scipy.signal.peak_prominences(column, peaks)[0].tolist()
+    return frames, bins, prominences
+
+
+@pytest.mark.parametrize("percentile,distance", [(90, 3), (50, 1), (33.3, 2.5)])
+def test_pick_peaks_matches_scipy(percentile, distance):
+    rng = np.random.default_rng(0)
+    C = rng.random((168, 40)).astype(np.float32)
+    C[:, 5] = 0  # silent frame
+    C[60:64, 7] = 2  # flat peak
+
+    frames, bins, prominences = pick_peaks(
+        C, np.arange(C.shape[1]), height_percentile=percentile, distance=distance
+    )
+    expected = _scipy_peaks(C, percentile, distance)
+    assert frames.tolist() == expected[0]
+    assert bins.tolist() == expected[1]
+    assert prominences.tolist() == expected[2]
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import numpy as np
+import pytest
+from src.HarmonyScope import generate
+from src.HarmonyScope.core import pitch
+from src.HarmonyScope.core.pitch_gpu import HAS_GPU
+from src.HarmonyScope.core.pitch import (
+    active_pitches_array,
+    pitch_frames,
+    pitch_frames_batch,
+)
+
+
+def _chord(name):
+    return generate.generate_chord_wave(name).astype(np.float32) / 32767
+
+
+def test_active_pitches_major_triad():
+    y = _chord("C")[: int(0.75 * generate.SAMPLE_RATE)]
+    active, table, peaks, voiced = active_pitches_array(y, generate.SAMPLE_RATE)
+    assert active == 0b10010001  # C, E, G
+    assert len(table.detection_count) == 12
+    assert np.flatnonzero(table.active).tolist() == [0, 4, 7]
+    assert voiced > 0
+    assert {p["pc"] for p in peaks} >= {0, 4, 7}
+
+
+def test_active_pitches_silence():
+    y = np.zeros(int(0.75 * generate.SAMPLE_RATE), dtype=np.float32)
+    active, table, peaks, voiced = active_pitches_array(
+        y, generate.SAMPLE_RATE, frame_energy_thresh_db=10
+    )
+    assert active == 0
+    assert peaks == []
+    assert voiced == 0
+
+
+def test_pitch_frames_batch_matches_single():
+    n = int(0.75 * generate.SAMPLE_RATE)
+    ys = np.stack([_chord("C")[:n], np.zeros(n, dtype=np.float32), _chord("Am")[:n]])
+    batch = pitch_frames_batch(ys, generate.SAMPLE_RATE)
+    for y, (voiced, peaks) in zip(ys, batch):
+        ref_voiced, ref_peaks = pitch_frames(y, generate.SAMPLE_RATE)
+        assert np.array_equal(voiced, ref_voiced)
+        assert peaks == ref_peaks
+
+
+@pytest.mark.skipif(HAS_GPU, reason="a CUDA device is available")
+def test_pitch_frames_cuda_without_gpu_raises():
+    with pytest.raises(RuntimeError, match="cupy"):
+        pitch_frames(_chord("C")[:4096], generate.SAMPLE_RATE, backend="cuda")
+
+
+def test_memoized_cqt_is_computed_once_per_input(monkeypatch):
+    calls = []
+
+    def counting_cqt(ys, sr, **kwargs):
+        calls.append(len(ys))
+        return compute(ys, sr, **kwargs)
+
+    compute = pitch._compute_cqt_magnitude
+    monkeypatch.setattr(pitch, "_compute_cqt_magnitude", counting_cqt)
+    monkeypatch.setattr(pitch, "_CQT_CACHE", OrderedDict())
+    y = _chord("C")[: generate.SAMPLE_RATE]
+
+    first = active_pitches_array(y, generate.SAMPLE_RATE, memoize_cqt=True)
+    second = active_pitches_array(y, generate.SAMPLE_RATE, memoize_cqt=True)
+    assert len(calls) == 1
+    assert first[0] == second[0]
+    assert first[2] == second[2]
+
+    # The key is the content, so samples changed in place miss the cache
+    y[:] = _chord("Am")[: generate.SAMPLE_RATE]
+    changed = active_pitches_array(y, generate.SAMPLE_RATE, memoize_cqt=True)
+    assert len(calls) == 2
+    assert changed[0] != first[0]
+
+    # Without memoize_cqt the CQT is always computed, and nothing is stored
+    active_pitches_array(y, generate.SAMPLE_RATE)
+    assert len(calls) == 3
+    assert len(pitch._CQT_CACHE) == 2